@@ -0,0 +1,148 @@
+import argparse
+import json
+import os
+import resource
+import tempfile
+import threading
+import time
+from typing import List, Optional
+
+from myrag import PDFRAG
+
+
+def _current_rss_mb() -> Optional[float]:
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    try:
+        # psutil 이 없으면 Linux 의 /proc 에서 읽습니다. (두 번째 값이 RSS 페이지 수)
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except OSError:
+        return None
+    return pages * resource.getpagesize() / (1024 * 1024)
+
+
+class _RSSSampler:
+    """with 블록 동안 RSS 를 주기적으로 읽어, 시작 시점 대비 최대 증가량(MB)을 구합니다.
+
+    ru_maxrss 는 프로세스 전체의 누적 최대값이라 앞 단계의 최대값이 뒤 단계에도
+    그대로 남습니다. 샘플링 간격보다 짧게 생겼다 사라지는 메모리는 놓칠 수 있습니다.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.peak_delta_mb = None
+        self._stop = threading.Event()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self._peak = max(self._peak, _current_rss_mb())
+
+    def __enter__(self):
+        self._start = _current_rss_mb()
+        if self._start is not None:
+            self._peak = self._start
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._start is not None:
+            self._stop.set()
+            self._thread.join()
+            self._peak = max(self._peak, _current_rss_mb())
+            self.peak_delta_mb = self._peak - self._start
+
+
+def _measure(fn):
+    # (결과, 실행 시간(초), 실행 중 RSS 최대 증가량(MB)) 를 반환합니다.
+    start = time.perf_counter()
+    with _RSSSampler() as rss:
+        value = fn()
+    return value, time.perf_counter() - start, rss.peak_delta_mb
+
+
+def make_sample_pdf(path: str, num_pages: int, lines_per_page: int = 45) -> str:
+    """영문 문장으로 num_pages 페이지 PDF 를 생성합니다."""
+    import pymupdf
+
+    pdf = pymupdf.open()
+    for page_number in range(num_pages):
+        page = pdf.new_page()
+        for i in range(lines_per_page):
+            line = f"Page {page_number} line {i}: retrieval augmented generation test."
+            page.insert_text((50, 60 + i * 16), line, fontsize=10)
+    pdf.save(path)
+    pdf.close()
+    return path
+
+
+def bench_pdfrag(
+    source_uris: Optional[List[str]] = None,
+    num_pages: List[int] = (20, 100),
+    embedding_size: int = 1536,
+) -> List[dict]:
+    """PDFRAG.create_retriever 의 load / split / embed+index 단계별 시간과 메모리를 측정합니다.
+
+    source_uris 를 주면 해당 PDF 들을, 아니면 num_pages 별 synthetic PDF 를 사용합니다.
+    임베딩은 API 호출 없이 stub(DeterministicFakeEmbedding) 으로 계산하고, 추출 캐시는
+    매번 빈 임시 폴더를 사용하므로 load 는 항상 캐시가 없는 상태로 측정됩니다.
+    """
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+
+    embedding = DeterministicFakeEmbedding(size=embedding_size)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if source_uris:
+            paths = list(source_uris)
+        else:
+            paths = [
+                make_sample_pdf(os.path.join(tmp_dir, f"sample-{n}.pdf"), n)
+                for n in num_pages
+            ]
+        for i, path in enumerate(paths):
+            rag = PDFRAG(
+                path,
+                llm=None,
+                embeddings=embedding,
+                extraction_cache_dir=os.path.join(tmp_dir, f"pdf_text-{i}"),
+            )
+            result = {"source_uri": os.path.basename(path)}
+            docs, seconds, rss = _measure(rag.load_documents)
+            result["load"] = {"seconds": seconds, "peak_rss_delta_mb": rss}
+            chunks, seconds, rss = _measure(lambda: rag.split_documents(docs))
+            result["split"] = {"seconds": seconds, "peak_rss_delta_mb": rss}
+            # PDFRAG 는 FAISS.from_documents 로 임베딩과 색인을 한 번에 수행합니다.
+            _, seconds, rss = _measure(lambda: rag.create_vectorstore(chunks))
+            result["embed_index"] = {"seconds": seconds, "peak_rss_delta_mb": rss}
+            total = sum(
+                result[stage]["seconds"] for stage in ["load", "split", "embed_index"]
+            )
+            result["total"] = {
+                "seconds": total,
+                "pages": len(docs),
+                "chunks": len(chunks),
+                "pages_per_second": len(docs) / total,
+                "chunks_per_second": len(chunks) / total,
+            }
+            results.append(result)
+    return results
+
+
+if __name__ == "__main__":
+    # 예시: python ingest_benchmark.py --options '{"num_pages": [500]}'
+    parser = argparse.ArgumentParser(description="PDFRAG 색인 단계별 벤치마크")
+    parser.add_argument(
+        "--options", type=json.loads, default={}, help="벤치마크 함수 인자 (JSON)"
+    )
+    parser.add_argument("--output", default=None, help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+    report = json.dumps(bench_pdfrag(**args.options), indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+    print(report)
@@ -1,21 +1,34 @@
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import PyMuPDFLoader
+from pdf_cache import PDFExtractionCache
 from langchain_community.vectorstores import FAISS
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import PromptTemplate
 from langchain_openai import OpenAIEmbeddings
 from langchain_core.runnables import RunnablePassthrough
+from embedding_cache import CachedEmbeddings
 
 
 class PDFRAG:
-    def __init__(self, file_path: str, llm):
+    def __init__(
+        self,
+        file_path: str,
+        llm,
+        embeddings=None,
+        extraction_cache_dir: str = ".cache/pdf_text",
+    ):
         self.file_path = file_path
         self.llm = llm
+        # None 이면 OpenAI 임베딩(text-embedding-3-small)을 사용합니다.
+        self.embeddings = embeddings
+        self.extraction_cache_dir = extraction_cache_dir
 
     def load_documents(self):
         # 문서 로드(Load Documents)
-        loader = PyMuPDFLoader(self.file_path)
-        docs = loader.load()
+        # 이미 추출한 페이지는 캐시(PDF 해시 기준)에서 읽습니다.
+        # 메타데이터(producer, creationdate 등)는 PyMuPDFLoader 와 같습니다.
+        docs = PDFExtractionCache(self.extraction_cache_dir).load(
+            self.file_path, backend="pymupdf"
+        )
         return docs
 
     def split_documents(self, docs):
@@ -26,7 +39,10 @@ class PDFRAG:
 
     def create_vectorstore(self, split_documents):
         # 임베딩(Embedding) 생성
-        embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+        # 동일한 chunk 는 캐시된 임베딩을 재사용합니다.
+        embeddings = self.embeddings or CachedEmbeddings(
+            OpenAIEmbeddings(model="text-embedding-3-small")
+        )
 
         # DB 생성(Create DB) 및 저장
         vectorstore = FAISS.from_documents(
@@ -0,0 +1,250 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+
+def normalize_text(text: str) -> str:
+    """유니코드 정규화(NFC) 후 앞뒤 공백을 제거합니다."""
+    return unicodedata.normalize("NFC", text).strip()
+
+
+class EmbeddingStore:
+    """메모리 LRU + 디스크(SQLite) 2단계 임베딩 저장소입니다."""
+
+    def __init__(
+        self,
+        path: str = ".cache/embedding_cache.db",
+        max_memory_items: int = 10000,
+        max_disk_items: Optional[int] = 1000000,
+        ttl: Optional[float] = None,
+    ):
+        self.path = path
+        self.max_memory_items = max_memory_items
+        self.max_disk_items = max_disk_items
+        self.ttl = ttl
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings "
+            "(key TEXT PRIMARY KEY, vector BLOB, created REAL, accessed REAL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_accessed ON embeddings(accessed)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        return hashlib.sha256(
+            f"{model}\0{normalize_text(text)}".encode("utf-8")
+        ).hexdigest()
+
+    def _remember(self, key: str, vector: List[float], created: float):
+        # TTL 을 메모리에서도 확인할 수 있도록 생성 시각을 함께 저장합니다.
+        self._memory[key] = (vector, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl is not None and now - created > self.ttl
+
+    def mget(self, keys: List[str]) -> List[Optional[List[float]]]:
+        """키 목록에 해당하는 벡터를 반환합니다. 없는 항목은 None 입니다."""
+        now = time.time()
+        results = [None] * len(keys)
+        with self._lock:
+            missing = []
+            for i, key in enumerate(keys):
+                entry = self._memory.get(key)
+                if entry is not None and self._expired(entry[1], now):
+                    del self._memory[key]
+                    entry = None
+                if entry is not None:
+                    self._memory.move_to_end(key)
+                    results[i] = entry[0]
+                    self.hits["memory"] += 1
+                else:
+                    missing.append(i)
+
+            found = {}
+            unique = list({keys[i] for i in missing})
+            # SQLite 변수 개수 제한을 넘지 않도록 나누어 조회합니다.
+            for start in range(0, len(unique), 500):
+                part = unique[start : start + 500]
+                rows = self._conn.execute(
+                    "SELECT key, vector, created FROM embeddings WHERE key IN (%s)"
+                    % ",".join("?" * len(part)),
+                    part,
+                ).fetchall()
+                for key, blob, created in rows:
+                    if self._expired(created, now):
+                        continue
+                    found[key] = (array("f", blob).tolist(), created)
+
+            for i in missing:
+                entry = found.get(keys[i])
+                if entry is None:
+                    self.misses += 1
+                    continue
+                results[i] = entry[0]
+                self.hits["disk"] += 1
+                self._remember(keys[i], *entry)
+
+            if found:
+                self._conn.executemany(
+                    "UPDATE embeddings SET accessed = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                self._conn.commit()
+        return results
+
+    def mset(self, items: Dict[str, List[float]]):
+        """벡터를 메모리와 디스크에 저장하고, 용량을 넘으면 오래된 항목을 지웁니다."""
+        now = time.time()
+        with self._lock:
+            for key, vector in items.items():
+                self._remember(key, vector, now)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)",
+                [
+                    (key, array("f", vector).tobytes(), now, now)
+                    for key, vector in items.items()
+                ],
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        if self.ttl is not None:
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE created < ?", (now - self.ttl,)
+            )
+        if self.max_disk_items is not None:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+            if count > self.max_disk_items:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY accessed LIMIT ?)",
+                    (count - self.max_disk_items,),
+                )
+
+    def stats(self) -> dict:
+        total = self.hits["memory"] + self.hits["disk"] + self.misses
+        return {
+            "memory_hits": self.hits["memory"],
+            "disk_hits": self.hits["disk"],
+            "misses": self.misses,
+            "hit_rate": (total - self.misses) / total if total else 0.0,
+            "memory_items": len(self._memory),
+        }
+
+
+_stores: Dict[str, EmbeddingStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_embedding_store(path: str = ".cache/embedding_cache.db", **kwargs):
+    """같은 경로의 저장소는 프로세스 안에서 하나만 생성하여 공유합니다."""
+    if path != ":memory:":
+        path = os.path.abspath(path)
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = EmbeddingStore(path, **kwargs)
+        return _stores[path]
+
+
+class CachedEmbeddings(Embeddings):
+    """(모델, 정규화된 텍스트 해시) 를 키로 임베딩 결과를 캐시합니다.
+
+    cache_documents=False 이면 질문(embed_query)만 캐시하고, 문서 임베딩은 그대로
+    계산합니다.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        store: Optional[EmbeddingStore] = None,
+        cache_documents: bool = True,
+    ):
+        self.embeddings = embeddings
+        self.store = store or get_embedding_store()
+        self.cache_documents = cache_documents
+        self.namespace = self._model_name(embeddings)
+        # 질문 임베딩은 모델에 따라 문서 임베딩과 다를 수 있으므로 따로 저장합니다.
+        self.query_namespace = self.namespace + ":query"
+
+    @staticmethod
+    def _model_name(embeddings) -> str:
+        for attr in ("model", "model_name"):
+            name = getattr(embeddings, attr, None)
+            if name:
+                return str(name)
+        return type(embeddings).__name__
+
+    @property
+    def model(self):
+        return self.namespace
+
+    def _split(self, texts: List[str], namespace: str):
+        keys = [self.store.make_key(namespace, text) for text in texts]
+        vectors = self.store.mget(keys)
+        # 같은 텍스트가 여러 번 나와도 한 번만 임베딩합니다.
+        missing = {}
+        for i, vector in enumerate(vectors):
+            if vector is None:
+                missing.setdefault(keys[i], texts[i])
+        return keys, vectors, missing
+
+    def _merge(self, keys, vectors, missing, new_vectors):
+        computed = dict(zip(missing, new_vectors))
+        if computed:
+            self.store.mset(computed)
+        return [
+            vector if vector is not None else computed[key]
+            for key, vector in zip(keys, vectors)
+        ]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not self.cache_documents:
+            return self.embeddings.embed_documents(texts)
+        keys, vectors, missing = self._split(texts, self.namespace)
+        new_vectors = (
+            self.embeddings.embed_documents(list(missing.values())) if missing else []
+        )
+        return self._merge(keys, vectors, missing, new_vectors)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not self.cache_documents:
+            return await self.embeddings.aembed_documents(texts)
+        keys, vectors, missing = self._split(texts, self.namespace)
+        new_vectors = (
+            await self.embeddings.aembed_documents(list(missing.values()))
+            if missing
+            else []
+        )
+        return self._merge(keys, vectors, missing, new_vectors)
+
+    def embed_query(self, text: str) -> List[float]:
+        keys, vectors, missing = self._split([text], self.query_namespace)
+        new_vectors = [self.embeddings.embed_query(text)] if missing else []
+        return self._merge(keys, vectors, missing, new_vectors)[0]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        keys, vectors, missing = self._split([text], self.query_namespace)
+        new_vectors = [await self.embeddings.aembed_query(text)] if missing else []
+        return self._merge(keys, vectors, missing, new_vectors)[0]
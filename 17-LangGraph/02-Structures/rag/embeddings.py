@@ -0,0 +1,193 @@
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+from rag.tokens import count_tokens
+
+
+class RateLimiter:
+    """분당 요청 수(RPM)와 분당 토큰 수(TPM)를 제한하는 token bucket 입니다.
+
+    사용량을 먼저 차감(예약)하고 부족한 만큼만 기다리므로, 여러 스레드/이벤트 루프에서
+    하나의 limiter 를 공유할 수 있습니다.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute or 0)
+        self._tokens = float(tokens_per_minute or 0)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: int) -> float:
+        """요청 1건과 tokens 만큼의 토큰을 예약하고, 기다려야 할 시간(초)을 반환합니다."""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated
+            self._updated = now
+            wait = 0.0
+            if self.requests_per_minute:
+                rate = self.requests_per_minute / 60
+                self._requests = min(
+                    self.requests_per_minute, self._requests + elapsed * rate
+                )
+                self._requests -= 1
+                wait = max(wait, -self._requests / rate)
+            if self.tokens_per_minute:
+                rate = self.tokens_per_minute / 60
+                self._tokens = min(
+                    self.tokens_per_minute, self._tokens + elapsed * rate
+                )
+                # 한 batch 가 TPM 보다 큰 경우에도 무한히 기다리지 않도록 제한합니다.
+                self._tokens -= min(tokens, self.tokens_per_minute)
+                wait = max(wait, -self._tokens / rate)
+            return wait
+
+    async def acquire(self, tokens: int):
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class ConcurrentEmbeddings(Embeddings):
+    """chunk 들을 토큰 예산 단위의 batch 로 묶어서 동시에 임베딩합니다.
+
+    내부 임베딩 모델(예: OpenAIEmbeddings)의 aembed_documents 를 호출하므로,
+    base_url 을 로컬 stub 서버로 지정하여 테스트할 수 있습니다.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        max_batch_tokens: int = 8000,
+        max_batch_size: int = 256,
+        max_concurrency: int = 4,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        max_retries: int = 5,
+        backoff: float = 1.0,
+        token_counter: Callable[[str], int] = count_tokens,
+    ):
+        self.embeddings = embeddings
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.token_counter = token_counter
+        self.limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self._metrics_lock = threading.Lock()
+        self.reset_metrics()
+
+    @property
+    def model(self):
+        # 캐시 키 등에서 내부 모델 이름을 그대로 사용할 수 있도록 합니다.
+        return getattr(self.embeddings, "model", None)
+
+    def reset_metrics(self):
+        with self._metrics_lock:
+            self.metrics = {
+                "requests": 0,
+                "texts": 0,
+                "tokens": 0,
+                "retries": 0,
+                "elapsed": 0.0,
+            }
+
+    def throughput(self) -> dict:
+        """누적 처리량(texts/s, tokens/s)을 반환합니다."""
+        with self._metrics_lock:
+            metrics = dict(self.metrics)
+        elapsed = metrics["elapsed"] or float("inf")
+        metrics["texts_per_second"] = metrics["texts"] / elapsed
+        metrics["tokens_per_second"] = metrics["tokens"] / elapsed
+        return metrics
+
+    def _record(self, **values):
+        with self._metrics_lock:
+            for name, value in values.items():
+                self.metrics[name] += value
+
+    def make_batches(self, texts: List[str]) -> List[Tuple[List[int], int]]:
+        """텍스트를 max_batch_tokens / max_batch_size 를 넘지 않는 batch 로 나눕니다.
+
+        Returns:
+            (텍스트 인덱스 목록, batch 토큰 수) 의 리스트
+        """
+        batches = []
+        indices, batch_tokens = [], 0
+        for i, text in enumerate(texts):
+            tokens = self.token_counter(text)
+            if indices and (
+                batch_tokens + tokens > self.max_batch_tokens
+                or len(indices) >= self.max_batch_size
+            ):
+                batches.append((indices, batch_tokens))
+                indices, batch_tokens = [], 0
+            indices.append(i)
+            batch_tokens += tokens
+        if indices:
+            batches.append((indices, batch_tokens))
+        return batches
+
+    async def _embed_batch(self, texts, semaphore, tokens):
+        async with semaphore:
+            for attempt in range(self.max_retries + 1):
+                await self.limiter.acquire(tokens)
+                try:
+                    vectors = await self.embeddings.aembed_documents(texts)
+                except Exception:
+                    if attempt == self.max_retries:
+                        raise
+                    self._record(retries=1)
+                    # 지수 백오프 + jitter 로 재시도합니다.
+                    await asyncio.sleep(
+                        self.backoff * 2**attempt * random.uniform(1, 1.5)
+                    )
+                    continue
+                self._record(requests=1, texts=len(texts), tokens=tokens)
+                return vectors
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        start = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        batches = self.make_batches(texts)
+        results = await asyncio.gather(
+            *[
+                self._embed_batch([texts[i] for i in indices], semaphore, tokens)
+                for indices, tokens in batches
+            ]
+        )
+        vectors = [None] * len(texts)
+        for (indices, _), batch_vectors in zip(batches, results):
+            for i, vector in zip(indices, batch_vectors):
+                vectors[i] = vector
+        self._record(elapsed=time.perf_counter() - start)
+        return vectors
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.aembed_documents(texts))
+        # 이미 이벤트 루프가 실행 중이면(예: Jupyter) 별도 스레드에서 실행합니다.
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, self.aembed_documents(texts)).result()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await self.embeddings.aembed_query(text)
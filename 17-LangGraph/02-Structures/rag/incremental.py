@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+from typing import Callable, Dict, List, Optional
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+
+def file_fingerprint(source_uri: str) -> str:
+    """파일 내용의 SHA-256 해시를 반환합니다."""
+    h = hashlib.sha256()
+    with open(source_uri, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def chunk_id(doc: Document) -> str:
+    """출처, 페이지, 내용으로 chunk 의 고유 ID 를 생성합니다."""
+    key = "\0".join(
+        [
+            str(doc.metadata.get("source", "")),
+            str(doc.metadata.get("page", "")),
+            doc.page_content,
+        ]
+    )
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+class IncrementalIndexer:
+    """파일별 fingerprint 와 chunk ID 를 추적하여 변경분만 다시 색인합니다."""
+
+    MANIFEST = "manifest.json"
+
+    def __init__(self, index_dir: str, embedding):
+        self.index_dir = index_dir
+        self.embedding = embedding
+        os.makedirs(self.index_dir, exist_ok=True)
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self) -> Dict:
+        path = os.path.join(self.index_dir, self.MANIFEST)
+        if not os.path.exists(path):
+            return {"files": {}}
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_manifest(self):
+        path = os.path.join(self.index_dir, self.MANIFEST)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _reset_manifest(self):
+        # 인덱스가 없는데 manifest 만 남아 있으면 모든 파일을 "유지" 로 판단하여
+        # chunk 가 사라지므로, manifest 를 비우고 전체를 다시 색인합니다.
+        self.manifest = {"files": {}}
+
+    def load_vectorstore(self) -> Optional[FAISS]:
+        """저장된 인덱스를 불러옵니다. 없거나 읽을 수 없으면 None 을 반환합니다."""
+        if not os.path.exists(os.path.join(self.index_dir, "index.faiss")):
+            self._reset_manifest()
+            return None
+        try:
+            return FAISS.load_local(
+                self.index_dir, self.embedding, allow_dangerous_deserialization=True
+            )
+        except Exception:
+            self._reset_manifest()
+            return None
+
+    def diff(self, source_uris: List[str]) -> Dict[str, List[str]]:
+        """manifest 와 비교하여 추가/변경/삭제/유지된 파일 목록을 반환합니다."""
+        files = self.manifest["files"]
+        report = {"added": [], "changed": [], "removed": [], "unchanged": []}
+        fingerprints = {}
+        for source_uri in source_uris:
+            fingerprints[source_uri] = file_fingerprint(source_uri)
+            if source_uri not in files:
+                report["added"].append(source_uri)
+            elif files[source_uri]["fingerprint"] != fingerprints[source_uri]:
+                report["changed"].append(source_uri)
+            else:
+                report["unchanged"].append(source_uri)
+        report["removed"] = [uri for uri in files if uri not in fingerprints]
+        self._fingerprints = fingerprints
+        return report
+
+    def update(
+        self,
+        vectorstore: Optional[FAISS],
+        source_uris: List[str],
+        load_and_split: Callable[[List[str]], List[Document]],
+    ):
+        """변경된 파일만 로드/분할하고, 새 chunk 만 임베딩하며 사라진 chunk 는 삭제합니다.
+
+        Returns:
+            (vectorstore, report) 튜플. report 에는 파일 목록과 chunk 수가 담깁니다.
+        """
+        if not source_uris:
+            raise ValueError("색인할 파일이 없습니다.")
+        if vectorstore is None:
+            self._reset_manifest()
+        report = self.diff(source_uris)
+        files = self.manifest["files"]
+        targets = report["added"] + report["changed"]
+        split_docs = load_and_split(targets) if targets else []
+
+        # 파일별로 새 chunk ID 를 계산합니다.
+        new_chunks = {uri: {} for uri in targets}
+        for doc in split_docs:
+            new_chunks[doc.metadata["source"]].setdefault(chunk_id(doc), doc)
+
+        existing_ids = set()
+        stale_ids = []
+        for uri in report["removed"]:
+            stale_ids.extend(files[uri]["chunk_ids"])
+        for uri in report["changed"]:
+            old_ids = set(files[uri]["chunk_ids"])
+            stale_ids.extend(old_ids - new_chunks[uri].keys())
+            existing_ids |= old_ids
+
+        add_ids, add_docs = [], []
+        for uri in targets:
+            for id_, doc in new_chunks[uri].items():
+                if id_ not in existing_ids:
+                    add_ids.append(id_)
+                    add_docs.append(doc)
+
+        if vectorstore is not None and stale_ids:
+            vectorstore.delete(stale_ids)
+        if add_docs:
+            if vectorstore is None:
+                vectorstore = FAISS.from_documents(
+                    add_docs, embedding=self.embedding, ids=add_ids
+                )
+            else:
+                vectorstore.add_documents(add_docs, ids=add_ids)
+
+        for uri in report["removed"]:
+            del files[uri]
+        for uri in targets:
+            files[uri] = {
+                "fingerprint": self._fingerprints[uri],
+                "chunk_ids": list(new_chunks[uri]),
+            }
+        if vectorstore is None:
+            raise ValueError("색인할 텍스트가 없습니다.")
+        vectorstore.save_local(self.index_dir)
+        self._save_manifest()
+
+        report["embedded_chunks"] = len(add_docs)
+        report["deleted_chunks"] = len(stale_ids)
+        return vectorstore, report
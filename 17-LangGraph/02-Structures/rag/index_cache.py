@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+from typing import List, Optional
+
+from langchain_community.vectorstores import FAISS
+
+
+class FAISSIndexCache:
+    """문서 내용 해시를 키로 FAISS 인덱스를 디스크에 저장하고 재사용합니다."""
+
+    def __init__(
+        self,
+        cache_dir: str = ".cache/faiss",
+        max_entries: int = 8,
+        max_bytes: Optional[int] = None,
+        mmap: bool = True,
+    ):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.mmap = mmap
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def _splitter_params(text_splitter) -> dict:
+        # 직렬화 가능한 설정값만 키에 포함합니다. (함수 등은 제외)
+        params = {"class": type(text_splitter).__name__}
+        for name, value in sorted(vars(text_splitter).items()):
+            if isinstance(value, (str, int, float, bool, list, tuple, type(None))):
+                params[name] = value
+        return params
+
+    @staticmethod
+    def _embedding_dimension(embedding) -> Optional[int]:
+        # 래퍼(CachedEmbeddings, ConcurrentEmbeddings)는 내부 임베딩의 설정을 확인합니다.
+        while getattr(embedding, "embeddings", None) is not None:
+            embedding = embedding.embeddings
+        for attr in ("dimensions", "size", "dimension"):
+            value = getattr(embedding, attr, None)
+            if isinstance(value, int) and not isinstance(value, bool):
+                return value
+        return None
+
+    @staticmethod
+    def _embedding_name(embedding) -> str:
+        name = type(embedding).__name__
+        for attr in ("model", "model_name"):
+            model = getattr(embedding, attr, None)
+            if model:
+                name = f"{name}:{model}"
+                break
+        # 같은 모델(클래스)이라도 출력 차원이 다르면 다른 인덱스를 사용합니다.
+        dimension = FAISSIndexCache._embedding_dimension(embedding)
+        if dimension is not None:
+            name = f"{name}:{dimension}"
+        return name
+
+    @staticmethod
+    def make_key(source_uris: List[str], text_splitter, embedding) -> str:
+        """원본 파일 내용 + splitter 설정 + 임베딩 모델 이름으로 캐시 키를 생성합니다."""
+        h = hashlib.sha256()
+        for source_uri in source_uris:
+            with open(source_uri, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    h.update(block)
+            h.update(b"\0")
+        h.update(
+            json.dumps(
+                FAISSIndexCache._splitter_params(text_splitter), default=str
+            ).encode()
+        )
+        h.update(FAISSIndexCache._embedding_name(embedding).encode())
+        return h.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def _read_index(self, path: str):
+        import faiss
+
+        index_path = os.path.join(path, "index.faiss")
+        flag = getattr(faiss, "IO_FLAG_MMAP_IFC", None) or getattr(
+            faiss, "IO_FLAG_MMAP", None
+        )
+        if self.mmap and flag is not None:
+            try:
+                # 인덱스 전체를 메모리에 올리지 않고 memory-map 으로 엽니다.
+                return faiss.read_index(index_path, flag | faiss.IO_FLAG_READ_ONLY)
+            except RuntimeError:
+                pass
+        return faiss.read_index(index_path)
+
+    def load(self, key: str, embedding) -> Optional[FAISS]:
+        """캐시에 저장된 인덱스를 불러옵니다. 없으면 None 을 반환합니다."""
+        path = self._path(key)
+        if not os.path.exists(os.path.join(path, "index.pkl")):
+            return None
+        index = self._read_index(path)
+        with open(os.path.join(path, "index.pkl"), "rb") as f:
+            docstore, index_to_docstore_id = pickle.load(f)
+        # LRU 순서를 위해 마지막 접근 시간을 갱신합니다.
+        os.utime(path)
+        return FAISS(
+            embedding_function=embedding,
+            index=index,
+            docstore=docstore,
+            index_to_docstore_id=index_to_docstore_id,
+        )
+
+    def save(self, key: str, vectorstore: FAISS) -> str:
+        """인덱스와 docstore 를 저장하고, 용량 제한을 넘으면 오래된 항목을 제거합니다."""
+        path = self._path(key)
+        # 임시 폴더에 저장한 뒤 이름을 바꿔서, 저장 도중의 인덱스를 읽지 않도록 합니다.
+        tmp_path = tempfile.mkdtemp(dir=self.cache_dir, prefix=".tmp-")
+        vectorstore.save_local(tmp_path)
+        if os.path.exists(path):
+            shutil.rmtree(tmp_path)
+        else:
+            os.replace(tmp_path, path)
+        self.evict(keep=key)
+        return path
+
+    def entries(self) -> List[dict]:
+        """캐시 항목을 오래된 순서로 반환합니다."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = self._path(name)
+            if name.startswith(".") or not os.path.isdir(path):
+                continue
+            size = sum(
+                os.path.getsize(os.path.join(path, file)) for file in os.listdir(path)
+            )
+            entries.append(
+                {"key": name, "size": size, "last_access": os.path.getmtime(path)}
+            )
+        return sorted(entries, key=lambda entry: entry["last_access"])
+
+    def evict(self, keep: Optional[str] = None) -> List[str]:
+        """개수/용량 제한을 넘는 항목을 LRU 순서로 삭제합니다."""
+        entries = [entry for entry in self.entries() if entry["key"] != keep]
+        # 방금 저장한 항목은 항상 남겨둡니다.
+        count = len(entries) + (1 if keep else 0)
+        total = sum(entry["size"] for entry in self.entries())
+        removed = []
+        for entry in entries:
+            over_count = self.max_entries is not None and count > self.max_entries
+            over_bytes = self.max_bytes is not None and total > self.max_bytes
+            if not (over_count or over_bytes):
+                break
+            shutil.rmtree(self._path(entry["key"]), ignore_errors=True)
+            removed.append(entry["key"])
+            count -= 1
+            total -= entry["size"]
+        return removed
@@ -0,0 +1,280 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+# 화면에 표시할 단계 이름
+STAGES = {
+    "queued": "대기 중",
+    "count": "페이지 확인",
+    "load": "문서 로드",
+    "split": "문서 분할",
+    "embed": "임베딩",
+    "index": "색인",
+    "done": "완료",
+    "error": "오류",
+}
+
+
+def format_progress(progress: Dict[str, Any]) -> str:
+    """progress() 결과를 화면에 표시할 문장으로 만듭니다."""
+    if progress["stage"] == "error":
+        return f"오류: {progress['error']}"
+    if progress["stage"] == "done":
+        return "색인 완료"
+    if progress["total_pages"] is None:
+        return f"{progress['stage_name']} 중..."
+    text = (
+        f"{progress['stage_name']} 중... "
+        f"{progress['pages_done']}/{progress['total_pages']} 페이지 색인 완료"
+    )
+    if progress["eta_seconds"] is not None:
+        text += f" (남은 시간 약 {progress['eta_seconds']:.0f}초)"
+    return text
+
+
+class IngestionJob:
+    """PDF 를 페이지 batch 단위로 load → split → embed → index 하는 색인 작업입니다.
+
+    - batch 하나가 끝날 때마다 벡터스토어에 추가되므로, 색인이 끝나기 전에도
+      이미 색인된 페이지에서 검색할 수 있습니다.
+    - progress() 로 현재 단계, 단계별 소요 시간, 진행률, 남은 시간(ETA)을 확인합니다.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        source_uris: List[str],
+        load_pages: Callable[[str, List[int]], List[Document]],
+        count_pages: Callable[[str], int],
+        text_splitter,
+        embeddings,
+        pages_per_batch: int = 8,
+        on_complete: Optional[Callable[[FAISS], None]] = None,
+        vectorstore: Optional[FAISS] = None,
+        on_finish: Optional[Callable[[], None]] = None,
+        keep_vectorstore: bool = True,
+    ):
+        self.key = key
+        self.source_uris = source_uris
+        self.load_pages = load_pages
+        self.count_pages = count_pages
+        self.text_splitter = text_splitter
+        self.embeddings = embeddings
+        self.pages_per_batch = pages_per_batch
+        self.on_complete = on_complete
+        self.vectorstore = vectorstore
+        # 성공/실패와 관계없이 작업이 끝나면 호출합니다. (예: 추출 캐시 저장)
+        self.on_finish = on_finish
+        # False 이면 색인이 끝난 뒤 벡터스토어를 놓습니다. on_complete 로 넘긴 곳
+        # (예: 인덱스 캐시)에서 검색하고, 완료된 작업은 진행 기록만 남깁니다.
+        self.keep_vectorstore = keep_vectorstore
+        self.stage = "queued" if vectorstore is None else "done"
+        self.stage_seconds: Dict[str, float] = {}
+        self.total_pages = None
+        self.pages_done = 0
+        self.chunks_done = 0
+        self.started_at = None
+        self.finished_at = None
+        self.error = None
+        # 색인(add)과 검색이 동시에 FAISS 인덱스에 접근하지 않도록 합니다.
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+        if vectorstore is not None:
+            self._finished.set()
+
+    @property
+    def done(self) -> bool:
+        return self._finished.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._finished.wait(timeout)
+
+    def _enter(self, stage: str) -> float:
+        self.stage = stage
+        return time.perf_counter()
+
+    def _leave(self, stage: str, started: float):
+        self.stage_seconds[stage] = (
+            self.stage_seconds.get(stage, 0.0) + time.perf_counter() - started
+        )
+
+    def _add(self, chunks: List[Document], vectors: List[List[float]]):
+        text_embeddings = [
+            (chunk.page_content, vector) for chunk, vector in zip(chunks, vectors)
+        ]
+        metadatas = [chunk.metadata for chunk in chunks]
+        with self._lock:
+            if self.vectorstore is None:
+                self.vectorstore = FAISS.from_embeddings(
+                    text_embeddings, self.embeddings, metadatas=metadatas
+                )
+            else:
+                self.vectorstore.add_embeddings(text_embeddings, metadatas=metadatas)
+
+    def run(self):
+        if self.done:
+            return self
+        self.started_at = time.time()
+        try:
+            started = self._enter("count")
+            pages = [
+                (source_uri, number)
+                for source_uri in self.source_uris
+                for number in range(self.count_pages(source_uri))
+            ]
+            self.total_pages = len(pages)
+            self._leave("count", started)
+
+            for start in range(0, len(pages), self.pages_per_batch):
+                batch = pages[start : start + self.pages_per_batch]
+                started = self._enter("load")
+                docs = []
+                for source_uri in dict.fromkeys(uri for uri, _ in batch):
+                    numbers = [number for uri, number in batch if uri == source_uri]
+                    docs.extend(self.load_pages(source_uri, numbers))
+                self._leave("load", started)
+
+                started = self._enter("split")
+                chunks = self.text_splitter.split_documents(docs)
+                self._leave("split", started)
+
+                if chunks:
+                    started = self._enter("embed")
+                    vectors = self.embeddings.embed_documents(
+                        [chunk.page_content for chunk in chunks]
+                    )
+                    self._leave("embed", started)
+
+                    started = self._enter("index")
+                    self._add(chunks, vectors)
+                    self._leave("index", started)
+
+                self.pages_done += len(batch)
+                self.chunks_done += len(chunks)
+
+            if self.vectorstore is None:
+                raise ValueError("색인할 텍스트가 없습니다.")
+            if self.on_complete is not None:
+                self.on_complete(self.vectorstore)
+            self.stage = "done"
+        except Exception as e:
+            self.error = e
+            self.stage = "error"
+        finally:
+            try:
+                if self.on_finish is not None:
+                    self.on_finish()
+            finally:
+                self.finished_at = time.time()
+                self._finished.set()
+        if self.stage == "done" and not self.keep_vectorstore:
+            # 완료를 알린 뒤에 놓으므로, 검색하는 쪽은 done 을 확인하고
+            # on_complete 로 넘겨받은 곳에서 검색하면 됩니다.
+            with self._lock:
+                self.vectorstore = None
+        return self
+
+    def progress(self) -> Dict[str, Any]:
+        """현재 단계, 진행률(0~1), 경과/남은 시간(초) 등을 반환합니다."""
+        if self.stage == "done":
+            fraction = 1.0
+        elif self.total_pages:
+            fraction = self.pages_done / self.total_pages
+        else:
+            fraction = 0.0
+        elapsed = None
+        eta = None
+        if self.started_at is not None:
+            elapsed = (self.finished_at or time.time()) - self.started_at
+            # 지금까지의 페이지당 처리 시간으로 남은 시간을 추정합니다.
+            if 0 < fraction < 1:
+                eta = elapsed * (1 - fraction) / fraction
+        return {
+            "key": self.key,
+            "stage": self.stage,
+            "stage_name": STAGES[self.stage],
+            "pages_done": self.pages_done,
+            "total_pages": self.total_pages,
+            "chunks_done": self.chunks_done,
+            "fraction": fraction,
+            "elapsed_seconds": elapsed,
+            "eta_seconds": eta,
+            "stage_seconds": dict(self.stage_seconds),
+            "error": None if self.error is None else repr(self.error),
+        }
+
+    def similarity_search(self, query: str, k: int = 4) -> List[Document]:
+        """지금까지 색인된 페이지에서 검색합니다."""
+        # 질문 임베딩은 lock 밖에서 계산하여 색인 작업을 오래 막지 않습니다.
+        embedding = self.embeddings.embed_query(query)
+        with self._lock:
+            if self.vectorstore is None:
+                return []
+            return self.vectorstore.similarity_search_by_vector(embedding, k=k)
+
+    def as_retriever(self, k: int = 4) -> "JobRetriever":
+        return JobRetriever(job=self, k=k)
+
+
+class JobRetriever(BaseRetriever):
+    """색인 중인 작업의 벡터스토어에서 검색하는 retriever 입니다."""
+
+    job: Any
+    k: int = 4
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        return self.job.similarity_search(query, k=self.k)
+
+
+class IngestionJobs:
+    """색인 작업을 스레드 풀에서 실행하고, 작업 상태(job table)를 관리합니다.
+
+    - 같은 key 의 작업이 진행 중이거나 완료되어 있으면 새로 실행하지 않습니다.
+    - 완료된 작업은 최근 max_finished 개까지만 보관합니다.
+    """
+
+    def __init__(self, max_workers: int = 2, max_finished: int = 16):
+        self.max_finished = max_finished
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="ingest"
+        )
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, job: IngestionJob) -> IngestionJob:
+        with self._lock:
+            current = self._jobs.get(job.key)
+            if current is not None and current.stage != "error":
+                return current
+            self._jobs[job.key] = job
+            self._evict()
+        if not job.done:
+            self._executor.submit(job.run)
+        return job
+
+    def _evict(self):
+        finished = [key for key, job in self._jobs.items() if job.done]
+        for key in finished[: max(0, len(finished) - self.max_finished)]:
+            del self._jobs[key]
+
+    def get(self, key: str) -> Optional[IngestionJob]:
+        with self._lock:
+            return self._jobs.get(key)
+
+    def table(self) -> List[Dict[str, Any]]:
+        """모든 작업의 진행 상태를 등록 순서대로 반환합니다."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job.progress() for job in jobs]
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,132 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import numpy as np
+from langchain_core.runnables import RunnableGenerator
+
+
+def context_fingerprint(inputs: Dict[str, Any]) -> str:
+    """질문을 제외한 입력(context, chat_history)의 해시를 반환합니다."""
+    h = hashlib.sha256()
+    for name in ("context", "chat_history"):
+        value = inputs.get(name)
+        if isinstance(value, list):
+            # Document 리스트는 본문만 사용합니다.
+            value = "\0".join(
+                getattr(item, "page_content", str(item)) for item in value
+            )
+        h.update(f"{name}\0{value}\0".encode("utf-8"))
+    return h.hexdigest()
+
+
+class SemanticCache:
+    """질문 임베딩의 코사인 거리가 가까운 이전 답변을 재사용하는 캐시입니다.
+
+    같은 context 에 대해, 코사인 거리가 threshold 이하인 질문이 이미 있으면
+    LLM 을 호출하지 않고 저장된 답변을 반환합니다.
+    """
+
+    def __init__(
+        self,
+        embedding,
+        threshold: float = 0.05,
+        max_entries: int = 1000,
+    ):
+        self.embedding = embedding
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # (fingerprint, 질문) 을 키로 정규화된 벡터와 답변을 LRU 순서로 보관합니다.
+        self._entries = OrderedDict()
+        # 같은 질문을 다시 임베딩하지 않도록 질문 벡터를 기억합니다.
+        self._vectors = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _embed(self, question: str) -> np.ndarray:
+        with self._lock:
+            if question in self._vectors:
+                self._vectors.move_to_end(question)
+                return self._vectors[question]
+        vector = np.asarray(self.embedding.embed_query(question), dtype=np.float32)
+        vector = vector / (np.linalg.norm(vector) or 1.0)
+        with self._lock:
+            self._vectors[question] = vector
+            while len(self._vectors) > self.max_entries:
+                self._vectors.popitem(last=False)
+        return vector
+
+    def lookup(self, question: str, fingerprint: str) -> Optional[str]:
+        """가장 가까운 질문의 답변을 반환합니다. 없으면 None 을 반환합니다."""
+        vector = self._embed(question)
+        with self._lock:
+            candidates = [
+                (key, entry)
+                for key, entry in self._entries.items()
+                if key[0] == fingerprint
+            ]
+            if candidates:
+                matrix = np.stack([entry["vector"] for _, entry in candidates])
+                distances = 1.0 - matrix @ vector
+                best = int(np.argmin(distances))
+                if distances[best] <= self.threshold:
+                    key, entry = candidates[best]
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry["answer"]
+            self.misses += 1
+        return None
+
+    def add(self, question: str, fingerprint: str, answer: str):
+        vector = self._embed(question)
+        with self._lock:
+            key = (fingerprint, question)
+            self._entries[key] = {"vector": vector, "answer": answer}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._entries),
+        }
+
+    def wrap(self, chain):
+        """chain 앞에 캐시를 붙인 Runnable 을 반환합니다. (invoke/stream 모두 지원)"""
+
+        def transform(input_stream):
+            # 입력은 하나의 dict 이므로 마지막 값을 사용합니다.
+            for inputs in input_stream:
+                pass
+            fingerprint = context_fingerprint(inputs)
+            answer = self.lookup(inputs["question"], fingerprint)
+            if answer is not None:
+                yield answer
+                return
+            chunks = []
+            for chunk in chain.stream(inputs):
+                chunks.append(chunk)
+                yield chunk
+            self.add(inputs["question"], fingerprint, "".join(chunks))
+
+        async def atransform(input_stream):
+            async for inputs in input_stream:
+                pass
+            fingerprint = context_fingerprint(inputs)
+            answer = self.lookup(inputs["question"], fingerprint)
+            if answer is not None:
+                yield answer
+                return
+            chunks = []
+            async for chunk in chain.astream(inputs):
+                chunks.append(chunk)
+                yield chunk
+            self.add(inputs["question"], fingerprint, "".join(chunks))
+
+        return RunnableGenerator(transform, atransform)
@@ -0,0 +1,276 @@
+import copy
+import re
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter, TextSplitter
+
+from rag.tokens import count_tokens
+
+# 문장부호 + 공백, 종결어미(다/요/음/함 ...) + 줄바꿈, 빈 줄을 문장 경계로 봅니다.
+# PDF 의 줄바꿈은 문장 중간에도 들어가므로, 줄바꿈만으로는 나누지 않습니다.
+_SENTENCE_BOUNDARY = re.compile(
+    r"[.!?。？！…]+[\"'”’)\]]*\s+"
+    r"|(?<=[다요죠까음임함됨])[ \t]*\n\s*"
+    r"|\n[ \t]*\n\s*"
+)
+
+
+@lru_cache(maxsize=None)
+def _compile(separator: str):
+    return re.compile(re.escape(separator))
+
+
+class _SeparatorIndex:
+    """텍스트 전체를 구분자별로 한 번만 스캔하여 위치를 기억합니다."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self._positions: Dict[str, List[int]] = {}
+
+    def positions(self, separator: str, start: int, end: int) -> List[int]:
+        """text[start:end] 를 re.split 했을 때 구분자가 나타나는 위치를 반환합니다."""
+        pattern = _compile(separator)
+        # 한 글자 구분자는 겹칠 수 없고, start == 0 이면 전체 스캔 결과와 같습니다.
+        if len(separator) == 1 or start == 0:
+            positions = self._positions.get(separator)
+            if positions is None:
+                positions = [m.start() for m in pattern.finditer(self.text)]
+                self._positions[separator] = positions
+            return positions[
+                bisect_left(positions, start) : bisect_right(
+                    positions, end - len(separator)
+                )
+            ]
+        return [m.start() for m in pattern.finditer(self.text, start, end)]
+
+
+class FastRecursiveCharacterTextSplitter(RecursiveCharacterTextSplitter):
+    """RecursiveCharacterTextSplitter 와 결과가 완전히 같은 빠른 splitter 입니다.
+
+    keep_separator=True(기본값) 이면 모든 조각이 원문의 연속 구간이므로, 문자열을
+    잘라 붙이는 대신 (start, end) offset 만으로 분할/병합합니다. 구분자 위치는
+    페이지(텍스트)마다 한 번만 스캔하고, 최종 chunk 만 문자열로 만듭니다.
+
+    length_function, 정규식 구분자, keep_separator 가 기본값이 아니면 기존 구현을
+    그대로 사용합니다.
+    """
+
+    def _is_fast_path(self) -> bool:
+        return (
+            self._length_function is len
+            and not self._is_separator_regex
+            and self._keep_separator in (True, "start")
+        )
+
+    def split_text(self, text: str) -> List[str]:
+        if not self._is_fast_path():
+            return super().split_text(text)
+        return [text[start:end] for start, end in self.split_text_offsets(text)]
+
+    def split_text_offsets(self, text: str) -> List[Tuple[int, int]]:
+        """chunk 를 원문에서의 (start, end) offset 으로 반환합니다."""
+        if not self._is_fast_path():
+            raise ValueError("offset 분할은 기본 설정에서만 사용할 수 있습니다.")
+        spans: List[Tuple[int, int]] = []
+        self._split_offsets(
+            _SeparatorIndex(text), 0, len(text), self._separators, spans
+        )
+        return spans
+
+    def _merge_offsets(
+        self, text: str, boundaries: List[int], first: int, last: int, spans: list
+    ):
+        """boundaries[first:last + 1] 로 나뉜 연속 조각들을 chunk_size 단위로 합칩니다.
+
+        TextSplitter._merge_splits 와 같은 규칙이며, 구분자 길이는 항상 0 입니다.
+        """
+        chunk_size = self._chunk_size
+        chunk_overlap = self._chunk_overlap
+        total = 0
+        for i in range(first, last):
+            length = boundaries[i + 1] - boundaries[i]
+            if total + length > chunk_size:
+                if i > first:
+                    self._emit(text, boundaries[first], boundaries[i], spans)
+                    while total > chunk_overlap or (
+                        total + length > chunk_size and total > 0
+                    ):
+                        total -= boundaries[first + 1] - boundaries[first]
+                        first += 1
+            total += length
+        if first < last:
+            self._emit(text, boundaries[first], boundaries[last], spans)
+
+    def _emit(self, text: str, start: int, end: int, spans: list):
+        if self._strip_whitespace:
+            while start < end and text[start].isspace():
+                start += 1
+            while end > start and text[end - 1].isspace():
+                end -= 1
+        if start < end:
+            spans.append((start, end))
+
+    def _split_offsets(
+        self,
+        index: _SeparatorIndex,
+        start: int,
+        end: int,
+        separators: List[str],
+        spans: list,
+    ):
+        text = index.text
+        # 구간 안에 존재하는 첫 번째 구분자를 사용합니다.
+        separator = separators[-1]
+        positions = None
+        new_separators: List[str] = []
+        for i, candidate in enumerate(separators):
+            if candidate == "":
+                separator = candidate
+                break
+            found = index.positions(candidate, start, end)
+            if found:
+                separator, positions = candidate, found
+                new_separators = separators[i + 1 :]
+                break
+
+        # 구분자는 다음 조각의 앞에 붙으므로, 조각 i 는 boundaries[i:i + 2] 구간입니다.
+        if separator == "":
+            boundaries = list(range(start, end + 1))
+        else:
+            if positions is None:
+                positions = index.positions(separator, start, end)
+            if positions and positions[0] == start:
+                # 맨 앞의 빈 조각은 버립니다.
+                boundaries = [*positions, end]
+            else:
+                boundaries = [start, *positions, end]
+
+        chunk_size = self._chunk_size
+        good_start = 0
+        for i in range(len(boundaries) - 1):
+            if boundaries[i + 1] - boundaries[i] < chunk_size:
+                continue
+            if good_start < i:
+                self._merge_offsets(text, boundaries, good_start, i, spans)
+            good_start = i + 1
+            if not new_separators:
+                # 더 나눌 구분자가 없으면 원래 구현처럼 strip 없이 그대로 추가합니다.
+                spans.append((boundaries[i], boundaries[i + 1]))
+            else:
+                self._split_offsets(
+                    index, boundaries[i], boundaries[i + 1], new_separators, spans
+                )
+        if good_start < len(boundaries) - 1:
+            self._merge_offsets(
+                text, boundaries, good_start, len(boundaries) - 1, spans
+            )
+
+
+def split_sentences(text: str) -> List[Tuple[int, int]]:
+    """한국어 문장 단위 (start, end) offset 목록을 반환합니다. (앞뒤 공백 제외)"""
+    spans = []
+    start = 0
+    for match in _SENTENCE_BOUNDARY.finditer(text):
+        spans.append((start, match.end()))
+        start = match.end()
+    spans.append((start, len(text)))
+    results = []
+    for start, end in spans:
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if start < end:
+            results.append((start, end))
+    return results
+
+
+class TokenSentenceTextSplitter(TextSplitter):
+    """토큰 수 기준으로, 한국어 문장 경계를 지키며 나누는 splitter 입니다.
+
+    - chunk_size/chunk_overlap 은 글자 수가 아니라 토큰 수입니다.
+    - chunk 는 문장 단위로 채우며, chunk_size 보다 긴 문장만 단어 단위로 나눕니다.
+    - metadata 에 원문 기준 start_index/end_index 와 token_count 를 기록합니다.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 256,
+        chunk_overlap: int = 32,
+        encoding_name: str = "cl100k_base",
+        token_counter: Optional[Callable[[str], int]] = None,
+        **kwargs,
+    ):
+        token_counter = token_counter or (
+            lambda text: count_tokens(text, encoding_name)
+        )
+        super().__init__(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            length_function=token_counter,
+            **kwargs,
+        )
+
+    def _pieces(self, text: str) -> List[Tuple[int, int, int]]:
+        """(start, end, 토큰 수) 조각 목록. 긴 문장은 단어 단위로 더 나눕니다."""
+        pieces = []
+        for start, end in split_sentences(text):
+            tokens = self._length_function(text[start:end])
+            if tokens <= self._chunk_size:
+                pieces.append((start, end, tokens))
+                continue
+            for word in re.finditer(r"\S+", text[start:end]):
+                word_start, word_end = start + word.start(), start + word.end()
+                pieces.append(
+                    (
+                        word_start,
+                        word_end,
+                        self._length_function(text[word_start:word_end]),
+                    )
+                )
+        return pieces
+
+    def split_text_offsets(self, text: str) -> List[Tuple[int, int, int]]:
+        """chunk 를 (start, end, 조각 토큰 수의 합) 으로 반환합니다."""
+        chunks = []
+        current: List[Tuple[int, int, int]] = []
+        total = 0
+        for piece in self._pieces(text):
+            if current and total + piece[2] > self._chunk_size:
+                chunks.append((current[0][0], current[-1][1], total))
+                # 끝에서부터 chunk_overlap 토큰 이내의 조각을 다음 chunk 에 이어 붙입니다.
+                while current and (
+                    total > self._chunk_overlap or total + piece[2] > self._chunk_size
+                ):
+                    total -= current.pop(0)[2]
+            current.append(piece)
+            total += piece[2]
+        if current:
+            chunks.append((current[0][0], current[-1][1], total))
+        return chunks
+
+    def split_text(self, text: str) -> List[str]:
+        return [text[start:end] for start, end, _ in self.split_text_offsets(text)]
+
+    def create_documents(
+        self, texts: List[str], metadatas: Optional[List[dict]] = None
+    ) -> List[Document]:
+        metadatas = metadatas or [{}] * len(texts)
+        documents = []
+        for text, metadata in zip(texts, metadatas):
+            for start, end, _ in self.split_text_offsets(text):
+                chunk = text[start:end]
+                chunk_metadata = copy.deepcopy(metadata)
+                # page 는 원본 metadata 에서 그대로 이어받습니다.
+                chunk_metadata.update(
+                    {
+                        "start_index": start,
+                        "end_index": end,
+                        "token_count": self._length_function(chunk),
+                    }
+                )
+                documents.append(Document(page_content=chunk, metadata=chunk_metadata))
+        return documents
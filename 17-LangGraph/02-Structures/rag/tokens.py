@@ -0,0 +1,14 @@
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def get_encoding(encoding_name: str = "cl100k_base"):
+    """tiktoken 인코더를 한 번만 생성하여 재사용합니다."""
+    import tiktoken
+
+    return tiktoken.get_encoding(encoding_name)
+
+
+def count_tokens(text: str, encoding_name: str = "cl100k_base") -> int:
+    """텍스트의 토큰 수를 반환합니다."""
+    return len(get_encoding(encoding_name).encode(text, disallowed_special=()))
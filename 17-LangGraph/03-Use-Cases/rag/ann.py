@@ -0,0 +1,203 @@
+import math
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+INDEX_TYPES = ("flat", "ivf", "hnsw", "ivfpq")
+
+
+def select_index_type(num_vectors: int) -> str:
+    """문서 수에 따라 인덱스 종류를 자동으로 선택합니다."""
+    if num_vectors < 10000:
+        # 작은 코퍼스는 정확한 검색(flat)도 충분히 빠릅니다.
+        return "flat"
+    if num_vectors < 200000:
+        return "hnsw"
+    if num_vectors < 1000000:
+        return "ivf"
+    # 매우 큰 코퍼스는 PQ 로 메모리를 압축합니다.
+    return "ivfpq"
+
+
+def _default_nlist(num_vectors: int) -> int:
+    # faiss 는 centroid 당 최소 39개의 학습 데이터를 권장합니다.
+    return max(1, min(int(4 * math.sqrt(num_vectors)), num_vectors // 39))
+
+
+def _pq_subquantizers(dim: int, pq_m: int) -> int:
+    # PQ 의 sub-quantizer 개수는 차원을 나누어 떨어지게 해야 합니다.
+    while dim % pq_m:
+        pq_m -= 1
+    return pq_m
+
+
+def build_index(
+    vectors: np.ndarray,
+    index_type: str = "auto",
+    nlist: Optional[int] = None,
+    nprobe: int = 8,
+    hnsw_m: int = 32,
+    ef_construction: int = 40,
+    ef_search: int = 64,
+    pq_m: int = 16,
+    pq_bits: int = 8,
+):
+    """벡터로 faiss 인덱스를 생성하고, 필요한 경우 학습(train)까지 수행합니다.
+
+    반환된 인덱스는 비어 있으므로 벡터를 따로 add 해야 합니다.
+    """
+    import faiss
+
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    num_vectors, dim = vectors.shape
+    if index_type == "auto":
+        index_type = select_index_type(num_vectors)
+
+    if index_type == "flat":
+        return faiss.IndexFlatL2(dim)
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, hnsw_m)
+        index.hnsw.efConstruction = ef_construction
+        index.hnsw.efSearch = ef_search
+        return index
+
+    nlist = nlist or _default_nlist(num_vectors)
+    quantizer = faiss.IndexFlatL2(dim)
+    if index_type == "ivf":
+        index = faiss.IndexIVFFlat(quantizer, dim, nlist)
+    elif index_type == "ivfpq":
+        # PQ 코드북(2^pq_bits 개) 학습에는 코드당 39개 이상의 벡터가 필요합니다.
+        pq_bits = min(pq_bits, max(1, int(math.log2(max(num_vectors // 39, 2)))))
+        index = faiss.IndexIVFPQ(
+            quantizer, dim, nlist, _pq_subquantizers(dim, pq_m), pq_bits
+        )
+    else:
+        raise ValueError(
+            f"지원하지 않는 index_type 입니다: {index_type} (가능한 값: {INDEX_TYPES})"
+        )
+    index.train(vectors)
+    index.nprobe = nprobe
+    return index
+
+
+def from_embeddings(
+    texts: List[str],
+    vectors: Sequence[Sequence[float]],
+    embedding,
+    metadatas: Optional[List[dict]] = None,
+    index_type: str = "auto",
+    **index_params,
+) -> FAISS:
+    """미리 계산한 임베딩으로 지정한 종류의 FAISS 벡터스토어를 생성합니다."""
+    index = build_index(np.asarray(vectors), index_type, **index_params)
+    vectorstore = FAISS(
+        embedding_function=embedding,
+        index=index,
+        docstore=InMemoryDocstore(),
+        index_to_docstore_id={},
+    )
+    vectorstore.add_embeddings(zip(texts, vectors), metadatas=metadatas)
+    return vectorstore
+
+
+def from_documents(
+    documents: List[Document], embedding, index_type: str = "auto", **index_params
+) -> FAISS:
+    texts = [doc.page_content for doc in documents]
+    vectors = embedding.embed_documents(texts)
+    return from_embeddings(
+        texts,
+        vectors,
+        embedding,
+        metadatas=[doc.metadata for doc in documents],
+        index_type=index_type,
+        **index_params,
+    )
+
+
+def _original_vectors(vectorstore: FAISS) -> np.ndarray:
+    import faiss
+
+    index = vectorstore.index
+    if isinstance(index, (faiss.IndexPQ, faiss.IndexIVFPQ)):
+        # PQ 인덱스는 근사값만 복원되므로 저장된 본문을 다시 임베딩합니다.
+        texts = [
+            vectorstore.docstore.search(
+                vectorstore.index_to_docstore_id[i]
+            ).page_content
+            for i in range(index.ntotal)
+        ]
+        return np.asarray(
+            vectorstore.embedding_function.embed_documents(texts), dtype=np.float32
+        )
+    # flat/HNSW/IVF-Flat 은 원본 벡터를 그대로 보관하므로 바로 꺼냅니다.
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is None or ivf.direct_map.type != faiss.DirectMap.NoMap:
+        return index.reconstruct_n(0, index.ntotal)
+    # IVF 는 direct map 이 있어야 벡터를 꺼낼 수 있으므로 잠시 만들었다가 지웁니다.
+    ivf.make_direct_map()
+    try:
+        return index.reconstruct_n(0, index.ntotal)
+    finally:
+        ivf.set_direct_map_type(faiss.DirectMap.NoMap)
+
+
+def recall_report(
+    vectorstore: FAISS,
+    queries: List[str],
+    k: int = 10,
+    index_types: Sequence[str] = ("flat", "ivf", "hnsw", "ivfpq"),
+    index_params: Optional[Dict[str, dict]] = None,
+    vectors: Optional[np.ndarray] = None,
+) -> List[dict]:
+    """flat(정확한 검색) 결과를 기준으로 인덱스 종류별 recall@k 와 검색 지연시간을 측정합니다.
+
+    vectors 는 색인에 사용한 원본 벡터입니다. 생략하면 vectorstore 에서 구합니다.
+    latency_ms 는 질문 하나를 검색하는 평균 시간이고, batch_ms_per_query 는 모든
+    질문을 한 번에 검색한 시간을 질문 수로 나눈 값입니다.
+    """
+    index_params = index_params or {}
+    if vectors is None:
+        vectors = _original_vectors(vectorstore)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    query_vectors = np.asarray(
+        [vectorstore.embedding_function.embed_query(query) for query in queries],
+        dtype=np.float32,
+    )
+    k = min(k, len(vectors))
+    # 기준값: 정확한 L2 검색 결과
+    exact = build_index(vectors, "flat")
+    exact.add(vectors)
+    _, truth = exact.search(query_vectors, k)
+
+    report = []
+    for index_type in index_types:
+        start = time.perf_counter()
+        index = build_index(vectors, index_type, **index_params.get(index_type, {}))
+        index.add(vectors)
+        build_seconds = time.perf_counter() - start
+
+        # 질문 하나씩 검색한 평균 지연시간과, 한 번에 검색했을 때의 질문당 시간을 구합니다.
+        start = time.perf_counter()
+        for query_vector in query_vectors:
+            index.search(query_vector[None, :], k)
+        latency = (time.perf_counter() - start) / len(queries)
+        start = time.perf_counter()
+        _, found = index.search(query_vectors, k)
+        batch_latency = (time.perf_counter() - start) / len(queries)
+
+        hits = sum(len(set(t) & set(f)) for t, f in zip(truth, found))
+        report.append(
+            {
+                "index_type": index_type,
+                f"recall@{k}": hits / (len(queries) * k),
+                "latency_ms": latency * 1000,
+                "batch_ms_per_query": batch_latency * 1000,
+                "build_seconds": build_seconds,
+            }
+        )
+    return report
@@ -0,0 +1,224 @@
+import json
+import os
+import tempfile
+from typing import Any, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+QUANTIZATIONS = ("float16", "int8")
+
+
+def _write_blobs(path: str, items: List[bytes]):
+    # 가변 길이 데이터를 하나의 파일과 offset 배열로 저장합니다.
+    offsets = np.zeros(len(items) + 1, dtype=np.int64)
+    with open(path + ".bin", "wb") as f:
+        for i, item in enumerate(items):
+            f.write(item)
+            offsets[i + 1] = offsets[i] + len(item)
+    np.save(path + ".offsets.npy", offsets)
+
+
+class _BlobArray:
+    """memory-map 된 파일에서 i 번째 항목만 읽어오는 배열입니다."""
+
+    def __init__(self, path: str):
+        self.offsets = np.load(path + ".offsets.npy", mmap_mode="r")
+        if self.offsets[-1] > 0:
+            self.data = np.memmap(path + ".bin", dtype=np.uint8, mode="r")
+        else:
+            self.data = np.zeros(0, dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> bytes:
+        return self.data[self.offsets[i] : self.offsets[i + 1]].tobytes()
+
+
+class CompactVectorStore(VectorStore):
+    """임베딩을 float16/int8 로 양자화하여 메모리에 두고, 원문과 float32 벡터는
+    디스크에 memory-map 으로 보관하는 벡터스토어입니다.
+
+    양자화된 벡터로 후보(k * rescore_factor 개)를 고른 뒤, 후보만 float32 로 다시
+    계산(re-scoring)하여 정확도를 유지합니다.
+    """
+
+    def __init__(
+        self,
+        embedding: Embeddings,
+        folder_path: str,
+        rescore_factor: int = 4,
+        block_size: int = 2048,
+    ):
+        self.embedding = embedding
+        self.folder_path = folder_path
+        self.rescore_factor = rescore_factor
+        self.block_size = block_size
+        with open(os.path.join(folder_path, "config.json"), encoding="utf-8") as f:
+            self.quantization = json.load(f)["quantization"]
+        self.codes = np.load(os.path.join(folder_path, "codes.npy"))
+        self.scale = np.load(os.path.join(folder_path, "scale.npy"))
+        self.norms = np.load(os.path.join(folder_path, "norms.npy"))
+        # 원본 벡터, 본문, 메타데이터는 필요한 행만 디스크에서 읽습니다.
+        self.vectors = np.load(os.path.join(folder_path, "vectors.npy"), mmap_mode="r")
+        self.texts = _BlobArray(os.path.join(folder_path, "texts"))
+        self.metadatas = _BlobArray(os.path.join(folder_path, "metadatas"))
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding
+
+    @staticmethod
+    def quantize(vectors: np.ndarray, quantization: str):
+        """(codes, scale) 를 반환합니다. int8 은 차원별 대칭 스케일을 사용합니다."""
+        if quantization == "float16":
+            return vectors.astype(np.float16), np.ones(vectors.shape[1], np.float32)
+        if quantization == "int8":
+            scale = np.abs(vectors).max(axis=0) / 127.0
+            scale[scale == 0] = 1.0
+            codes = np.clip(np.rint(vectors / scale), -127, 127).astype(np.int8)
+            return codes, scale.astype(np.float32)
+        raise ValueError(
+            f"지원하지 않는 quantization 입니다: {quantization} (가능한 값: {QUANTIZATIONS})"
+        )
+
+    @classmethod
+    def save(
+        cls,
+        folder_path: str,
+        texts: List[str],
+        vectors: np.ndarray,
+        metadatas: Optional[List[dict]] = None,
+        quantization: str = "int8",
+    ):
+        """벡터와 본문을 압축 형식으로 folder_path 에 저장합니다."""
+        os.makedirs(folder_path, exist_ok=True)
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        codes, scale = cls.quantize(vectors, quantization)
+        # 양자화된 벡터의 norm 을 미리 계산해 L2 거리 계산에 사용합니다.
+        dequantized = codes.astype(np.float32) * scale
+        np.save(os.path.join(folder_path, "vectors.npy"), vectors)
+        np.save(os.path.join(folder_path, "codes.npy"), codes)
+        np.save(os.path.join(folder_path, "scale.npy"), scale)
+        np.save(
+            os.path.join(folder_path, "norms.npy"),
+            np.einsum("ij,ij->i", dequantized, dequantized),
+        )
+        _write_blobs(
+            os.path.join(folder_path, "texts"), [t.encode("utf-8") for t in texts]
+        )
+        metadatas = metadatas or [{} for _ in texts]
+        _write_blobs(
+            os.path.join(folder_path, "metadatas"),
+            [json.dumps(m, ensure_ascii=False).encode("utf-8") for m in metadatas],
+        )
+        with open(os.path.join(folder_path, "config.json"), "w", encoding="utf-8") as f:
+            json.dump({"quantization": quantization}, f)
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        folder_path: Optional[str] = None,
+        quantization: str = "int8",
+        **kwargs: Any,
+    ) -> "CompactVectorStore":
+        folder_path = folder_path or tempfile.mkdtemp(prefix="compact-")
+        vectors = np.asarray(embedding.embed_documents(list(texts)), dtype=np.float32)
+        cls.save(folder_path, list(texts), vectors, metadatas, quantization)
+        return cls(embedding, folder_path, **kwargs)
+
+    def add_texts(
+        self, texts: Iterable[str], metadatas: Optional[List[dict]] = None, **kwargs
+    ) -> List[str]:
+        raise NotImplementedError(
+            "CompactVectorStore 는 from_texts/from_documents 로 한 번에 생성해야 합니다."
+        )
+
+    def _approximate_distances(self, query: np.ndarray) -> np.ndarray:
+        # ||x||^2 - 2 x·q 를 block 단위로 계산합니다. float32 로 변환하는 임시 메모리는
+        # block_size 행(d=1536, 2048 행 기준 약 12MB)의 버퍼 하나만 재사용합니다.
+        scaled_query = query * self.scale
+        distances = np.empty(len(self.codes), dtype=np.float32)
+        buffer = np.empty(
+            (min(self.block_size, len(self.codes)), self.codes.shape[1]),
+            dtype=np.float32,
+        )
+        for start in range(0, len(self.codes), self.block_size):
+            codes = self.codes[start : start + self.block_size]
+            block = buffer[: len(codes)]
+            np.copyto(block, codes)
+            distances[start : start + len(block)] = self.norms[
+                start : start + len(block)
+            ] - 2.0 * (block @ scaled_query)
+        return distances
+
+    def _document(self, i: int) -> Document:
+        return Document(
+            page_content=self.texts[i].decode("utf-8"),
+            metadata=json.loads(self.metadatas[i].decode("utf-8")),
+        )
+
+    def _search(self, embedding: List[float], k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(행 번호, float32 L2 거리) 를 가까운 순서로 반환합니다."""
+        query = np.asarray(embedding, dtype=np.float32)
+        k = min(k, len(self.codes))
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        num_candidates = min(len(self.codes), k * self.rescore_factor)
+        distances = self._approximate_distances(query)
+        candidates = np.argpartition(distances, num_candidates - 1)[:num_candidates]
+        # 후보만 float32 원본 벡터로 정확한 L2 거리를 다시 계산합니다.
+        candidates.sort()
+        exact = np.asarray(self.vectors[candidates], dtype=np.float32) - query
+        exact = np.einsum("ij,ij->i", exact, exact)
+        order = np.argsort(exact)[:k]
+        return candidates[order], exact[order]
+
+    def similarity_search_with_score_by_vector(
+        self, embedding: List[float], k: int = 4
+    ) -> List[Tuple[Document, float]]:
+        ids, distances = self._search(embedding, k)
+        return [
+            (self._document(int(i)), float(distance))
+            for i, distance in zip(ids, distances)
+        ]
+
+    def search_with_vectors(
+        self, embedding: List[float], k: int = 4
+    ) -> Tuple[List[Document], np.ndarray]:
+        """검색된 Document 와 각 Document 의 float32 원본 벡터를 반환합니다."""
+        ids, _ = self._search(embedding, k)
+        vectors = np.asarray(self.vectors[ids], dtype=np.float32)
+        return [self._document(int(i)) for i in ids], vectors
+
+    def get_documents(self) -> List[Document]:
+        """저장된 모든 chunk 를 저장 순서대로 반환합니다."""
+        return [self._document(i) for i in range(len(self.codes))]
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vector(
+            self.embedding.embed_query(query), k
+        )
+
+    def similarity_search_by_vector(
+        self, embedding: List[float], k: int = 4, **kwargs: Any
+    ) -> List[Document]:
+        return [
+            doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k)
+        ]
+
+    def similarity_search(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+    def _select_relevance_score_fn(self):
+        return self._euclidean_relevance_score_fn
@@ -0,0 +1,109 @@
+from typing import Any, List, Tuple
+
+import numpy as np
+from langchain_community.vectorstores import FAISS
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from rag.compact import CompactVectorStore
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def mmr_select(
+    query_embedding,
+    embeddings,
+    k: int = 4,
+    lambda_mult: float = 0.5,
+) -> List[int]:
+    """MMR(Maximal Marginal Relevance) 로 k 개의 후보 인덱스를 선택합니다.
+
+    선택된 문서와의 최대 유사도를 벡터 하나로 유지하면서 갱신하므로, 선택 1회당
+    행렬-벡터 곱 한 번만 계산합니다. (후보별 파이썬 루프 없음)
+    """
+    embeddings = _normalize(np.asarray(embeddings, dtype=np.float32))
+    query = _normalize(np.asarray(query_embedding, dtype=np.float32).reshape(-1))
+    k = min(k, len(embeddings))
+    if k <= 0:
+        return []
+
+    similarity_to_query = embeddings @ query
+    # 각 후보와 "이미 선택된 문서들" 사이의 최대 유사도
+    max_similarity = np.full(len(embeddings), -np.inf, dtype=np.float32)
+    selected = [int(np.argmax(similarity_to_query))]
+    available = np.ones(len(embeddings), dtype=bool)
+    available[selected[0]] = False
+    while len(selected) < k:
+        np.maximum(
+            max_similarity, embeddings @ embeddings[selected[-1]], out=max_similarity
+        )
+        scores = lambda_mult * similarity_to_query - (1 - lambda_mult) * max_similarity
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+    return selected
+
+
+def reconstruct(index, ids: np.ndarray) -> np.ndarray:
+    """faiss 인덱스에서 ids 에 해당하는 벡터를 복원합니다."""
+    try:
+        return index.reconstruct_batch(ids)
+    except RuntimeError:
+        # IVF 계열 인덱스는 direct map 이 있어야 복원할 수 있습니다.
+        index.make_direct_map()
+        return index.reconstruct_batch(ids)
+
+
+def search_with_vectors(
+    vectorstore, query_embedding: np.ndarray, fetch_k: int
+) -> Tuple[List[Document], np.ndarray]:
+    """fetch_k 개의 검색 결과와 각 결과의 벡터를 반환합니다."""
+    if isinstance(vectorstore, CompactVectorStore):
+        return vectorstore.search_with_vectors(query_embedding, fetch_k)
+    if not isinstance(vectorstore, FAISS):
+        raise ValueError(
+            f"MMR 검색을 지원하지 않는 벡터스토어입니다: {type(vectorstore).__name__}"
+        )
+    _, ids = vectorstore.index.search(
+        np.asarray([query_embedding], dtype=np.float32), fetch_k
+    )
+    ids = ids[0][ids[0] >= 0]
+    if len(ids) == 0:
+        return [], np.zeros((0, vectorstore.index.d), dtype=np.float32)
+    docs = []
+    for i in ids:
+        doc_id = vectorstore.index_to_docstore_id[int(i)]
+        doc = vectorstore.docstore.search(doc_id)
+        docs.append(
+            Document(id=doc_id, page_content=doc.page_content, metadata=doc.metadata)
+        )
+    return docs, reconstruct(vectorstore.index, ids)
+
+
+class MMRRetriever(BaseRetriever):
+    """FAISS/CompactVectorStore 에서 fetch_k 개를 검색한 뒤, NumPy MMR 로 k 개를 고릅니다."""
+
+    vectorstore: Any
+    k: int = 4
+    fetch_k: int = 20
+    lambda_mult: float = 0.5
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        query_embedding = np.asarray(
+            self.vectorstore.embeddings.embed_query(query), dtype=np.float32
+        )
+        docs, candidates = search_with_vectors(
+            self.vectorstore, query_embedding, self.fetch_k
+        )
+        if not docs:
+            return []
+        selected = mmr_select(query_embedding, candidates, self.k, self.lambda_mult)
+        return [docs[i] for i in selected]
@@ -0,0 +1,291 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+BACKENDS = ("pdfplumber", "pymupdf")
+
+
+def file_hash(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """파일 내용의 SHA-256 해시를 반환합니다."""
+    h = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def resolve_backend(backend: str) -> str:
+    # auto 는 PyMuPDF 가 설치되어 있으면 더 빠른 PyMuPDF 를 사용합니다.
+    if backend == "auto":
+        try:
+            import pymupdf  # noqa: F401
+        except ImportError:
+            return "pdfplumber"
+        return "pymupdf"
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"지원하지 않는 backend 입니다: {backend} (가능한 값: {BACKENDS})"
+        )
+    return backend
+
+
+def _plain_metadata(metadata: dict) -> dict:
+    return {k: v for k, v in (metadata or {}).items() if type(v) in [str, int]}
+
+
+def _pymupdf_metadata(metadata: dict) -> dict:
+    # PyMuPDFLoader 와 같이 소문자 creationdate/moddate 키를 ISO 형식으로 추가합니다.
+    info = _plain_metadata(metadata)
+    for key in ["creationDate", "modDate"]:
+        if key in info:
+            try:
+                info[key.lower()] = datetime.strptime(
+                    info[key].replace("'", ""), "D:%Y%m%d%H%M%S%z"
+                ).isoformat("T")
+            except ValueError:
+                info[key.lower()] = info[key]
+    return info
+
+
+def _extract_pdfplumber(file_path: str, pages: List[int]):
+    import pdfplumber
+
+    with pdfplumber.open(file_path) as pdf:
+        info = {"total_pages": len(pdf.pages), **_plain_metadata(pdf.metadata)}
+        texts = []
+        for number in pages:
+            page = pdf.pages[number]
+            # PDFPlumberLoader 와 동일하게 페이지 끝에 줄바꿈을 붙입니다.
+            texts.append(page.extract_text() + "\n")
+            page.close()
+    return info, texts
+
+
+def _extract_pymupdf(file_path: str, pages: List[int]):
+    import pymupdf
+
+    with pymupdf.open(file_path) as pdf:
+        info = {"total_pages": pdf.page_count, **_pymupdf_metadata(pdf.metadata)}
+        # PyMuPDFLoader 와 동일하게 앞뒤 공백을 제거합니다.
+        texts = [pdf[number].get_text().strip() for number in pages]
+    return info, texts
+
+
+def extract_pages(file_path: str, backend: str, pages: List[int]):
+    """지정한 페이지 번호들의 텍스트를 추출합니다. (프로세스 풀에서 실행)"""
+    if backend == "pymupdf":
+        return _extract_pymupdf(file_path, pages)
+    return _extract_pdfplumber(file_path, pages)
+
+
+def count_pages(file_path: str, backend: str) -> int:
+    if backend == "pymupdf":
+        import pymupdf
+
+        with pymupdf.open(file_path) as pdf:
+            return pdf.page_count
+    import pdfplumber
+
+    with pdfplumber.open(file_path) as pdf:
+        return len(pdf.pages)
+
+
+def page_documents(
+    file_path: str, info: dict, texts: Dict[int, str]
+) -> Iterator[Document]:
+    """{페이지 번호: 텍스트} 를 PDFPlumberLoader 와 같은 형식의 Document 로 변환합니다."""
+    for number, text in texts.items():
+        yield Document(
+            page_content=text,
+            metadata={
+                "source": file_path,
+                "file_path": file_path,
+                "page": number,
+                **info,
+            },
+        )
+
+
+class PDFExtractionCache:
+    """PDF 해시별로 페이지 텍스트를 열(column) 형식 파일(.npz)에 저장하는 캐시입니다.
+
+    - 페이지 번호, 텍스트 offset, UTF-8 텍스트를 각각 하나의 배열로 저장합니다.
+    - 문서 공통 메타데이터는 한 번만 저장하고, source/page 는 읽을 때 채웁니다.
+    - 캐시에 없는 페이지만 프로세스 풀에서 병렬로 추출합니다.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = ".cache/pdf_text",
+        max_workers: Optional[int] = None,
+        pages_per_task: int = 16,
+    ):
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.pages_per_task = pages_per_task
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key: str, backend: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.{backend}.npz")
+
+    def _read(self, path: str) -> Tuple[dict, Dict[int, str]]:
+        if not os.path.exists(path):
+            return {}, {}
+        with np.load(path, allow_pickle=False) as data:
+            info = json.loads(str(data["info"]))
+            numbers = data["pages"].tolist()
+            offsets = data["offsets"]
+            text = data["text"].tobytes()
+        texts = {
+            number: text[offsets[i] : offsets[i + 1]].decode("utf-8")
+            for i, number in enumerate(numbers)
+        }
+        return info, texts
+
+    def _write(self, path: str, info: dict, texts: Dict[int, str]):
+        numbers = sorted(texts)
+        encoded = [texts[number].encode("utf-8") for number in numbers]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(item) for item in encoded])
+        # 임시 파일에 쓴 뒤 교체하여, 동시에 읽는 쪽이 깨진 파일을 보지 않게 합니다.
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".npz")
+        with os.fdopen(fd, "wb") as f:
+            np.savez(
+                f,
+                info=np.array(json.dumps(info, ensure_ascii=False)),
+                pages=np.asarray(numbers, dtype=np.int32),
+                offsets=offsets,
+                text=np.frombuffer(b"".join(encoded), dtype=np.uint8),
+            )
+        os.replace(tmp_path, path)
+
+    def _extract_missing(
+        self, file_path: str, backend: str, missing: List[int]
+    ) -> Tuple[dict, Dict[int, str]]:
+        tasks = [
+            missing[start : start + self.pages_per_task]
+            for start in range(0, len(missing), self.pages_per_task)
+        ]
+        if len(tasks) == 1:
+            # 작업이 하나뿐이면 프로세스 풀을 띄우지 않습니다.
+            results = [extract_pages(file_path, backend, tasks[0])]
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                results = list(
+                    executor.map(
+                        extract_pages,
+                        [file_path] * len(tasks),
+                        [backend] * len(tasks),
+                        tasks,
+                    )
+                )
+        info, texts = {}, {}
+        for (task_info, task_texts), pages in zip(results, tasks):
+            info = task_info
+            texts.update(zip(pages, task_texts))
+        return info, texts
+
+    def load_pages(
+        self,
+        file_path: str,
+        backend: str = "pdfplumber",
+        pages: Optional[List[int]] = None,
+    ) -> Tuple[dict, Dict[int, str]]:
+        """(문서 메타데이터, {페이지 번호: 텍스트}) 를 반환합니다."""
+        backend = resolve_backend(backend)
+        path = self._path(file_hash(file_path), backend)
+        with self._lock:
+            info, texts = self._read(path)
+        if pages is None:
+            total_pages = info.get("total_pages")
+            if total_pages is None:
+                total_pages = count_pages(file_path, backend)
+            pages = list(range(total_pages))
+        missing = [number for number in pages if number not in texts]
+        if missing:
+            new_info, new_texts = self._extract_missing(file_path, backend, missing)
+            with self._lock:
+                # 다른 요청이 그 사이에 저장한 페이지도 합쳐서 저장합니다.
+                info, texts = self._read(path)
+                info = info or new_info
+                texts.update(new_texts)
+                self._write(path, info, texts)
+        return info, {number: texts[number] for number in pages}
+
+    def lazy_load(
+        self,
+        file_path: str,
+        backend: str = "pdfplumber",
+        pages: Optional[List[int]] = None,
+    ) -> Iterator[Document]:
+        info, texts = self.load_pages(file_path, backend, pages)
+        yield from page_documents(file_path, info, texts)
+
+    def load(
+        self,
+        file_path: str,
+        backend: str = "pdfplumber",
+        pages: Optional[List[int]] = None,
+    ) -> List[Document]:
+        """PDFPlumberLoader/PyMuPDFLoader 처럼 페이지별 Document 리스트를 반환합니다."""
+        return list(self.lazy_load(file_path, backend, pages))
+
+
+class PDFPageLoader:
+    """색인 작업 하나에서 PDF 페이지를 batch 단위로 나누어 읽는 loader 입니다.
+
+    PDFExtractionCache.load() 를 batch 마다 호출하면 매번 파일 해시를 계산하고
+    캐시 파일 전체를 다시 쓰게 됩니다. PDFPageLoader 는 PDF 마다 해시 계산과 캐시
+    읽기를 한 번만 하고, 새로 추출한 페이지는 flush() 에서 한 번에 저장합니다.
+    """
+
+    def __init__(self, cache: PDFExtractionCache, backend: str = "pdfplumber"):
+        self.cache = cache
+        self.backend = resolve_backend(backend)
+        # file_path -> [캐시 경로, 문서 메타데이터, {페이지 번호: 텍스트}, 새 페이지 여부]
+        self._files: Dict[str, list] = {}
+
+    def _open(self, file_path: str) -> list:
+        if file_path not in self._files:
+            path = self.cache._path(file_hash(file_path), self.backend)
+            with self.cache._lock:
+                info, texts = self.cache._read(path)
+            self._files[file_path] = [path, info, texts, False]
+        return self._files[file_path]
+
+    def __call__(self, file_path: str, pages: List[int]) -> List[Document]:
+        entry = self._open(file_path)
+        _, info, texts, _ = entry
+        missing = [number for number in pages if number not in texts]
+        if missing:
+            new_info, new_texts = self.cache._extract_missing(
+                file_path, self.backend, missing
+            )
+            entry[1] = info = info or new_info
+            texts.update(new_texts)
+            entry[3] = True
+        return list(
+            page_documents(file_path, info, {number: texts[number] for number in pages})
+        )
+
+    def flush(self):
+        """새로 추출한 페이지를 PDF 마다 한 번씩 캐시 파일에 저장합니다."""
+        for entry in self._files.values():
+            path, info, texts, changed = entry
+            if not changed:
+                continue
+            with self.cache._lock:
+                # 다른 요청이 그 사이에 저장한 페이지도 합쳐서 저장합니다.
+                saved_info, saved_texts = self.cache._read(path)
+                saved_texts.update(texts)
+                self.cache._write(path, saved_info or info, saved_texts)
+            entry[3] = False
@@ -0,0 +1,127 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.callbacks import Callbacks
+from langchain_core.documents import BaseDocumentCompressor, Document
+from pydantic import PrivateAttr
+
+from rag.tokens import count_tokens
+
+
+def _chunk_id(doc: Document) -> str:
+    if doc.id:
+        return doc.id
+    return hashlib.sha256(doc.page_content.encode("utf-8")).hexdigest()
+
+
+class OnnxCrossEncoderReranker(BaseDocumentCompressor):
+    """로컬 ONNX cross-encoder 로 (질문, chunk) 쌍의 점수를 계산해 재정렬합니다.
+
+    model_path 폴더에는 model.onnx 와 tokenizer.json 이 있어야 합니다.
+    (예: BAAI/bge-reranker-v2-m3, cross-encoder/ms-marco-MiniLM-L-6-v2 를 ONNX 로 변환)
+    """
+
+    model_path: str
+    top_n: int = 3
+    batch_size: int = 16
+    max_length: int = 512
+    # 재정렬 후 남길 chunk 들의 최대 토큰 수 (None 이면 제한 없음)
+    max_tokens: Optional[int] = None
+    cache_size: int = 10000
+    num_threads: Optional[int] = None
+
+    _session: Any = PrivateAttr(default=None)
+    _tokenizer: Any = PrivateAttr(default=None)
+    _cache: Any = PrivateAttr(default_factory=OrderedDict)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    def _load(self):
+        # 모델은 처음 사용할 때 한 번만 불러옵니다.
+        if self._session is not None:
+            return
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        options = ort.SessionOptions()
+        if self.num_threads:
+            options.intra_op_num_threads = self.num_threads
+        self._session = ort.InferenceSession(
+            os.path.join(self.model_path, "model.onnx"),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+        tokenizer = Tokenizer.from_file(os.path.join(self.model_path, "tokenizer.json"))
+        tokenizer.enable_truncation(max_length=self.max_length)
+        tokenizer.enable_padding()
+        self._tokenizer = tokenizer
+
+    def _predict(self, pairs: Sequence[Tuple[str, str]]) -> np.ndarray:
+        encodings = self._tokenizer.encode_batch(list(pairs))
+        features = {
+            "input_ids": np.asarray([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.asarray(
+                [e.attention_mask for e in encodings], dtype=np.int64
+            ),
+            "token_type_ids": np.asarray(
+                [e.type_ids for e in encodings], dtype=np.int64
+            ),
+        }
+        # 모델이 실제로 받는 입력만 전달합니다.
+        inputs = {i.name: features[i.name] for i in self._session.get_inputs()}
+        logits = self._session.run(None, inputs)[0]
+        # 출력이 (batch, 1) 이면 그대로, (batch, 2) 이면 positive 클래스 점수를 사용합니다.
+        return logits[:, -1] if logits.ndim == 2 else logits
+
+    def score(self, query: str, documents: Sequence[Document]) -> List[float]:
+        """(질문, chunk id) 별 점수를 캐시하며, 캐시에 없는 쌍만 batch 로 계산합니다."""
+        self._load()
+        keys = [(query, _chunk_id(doc)) for doc in documents]
+        scores: List[Optional[float]] = [None] * len(documents)
+        with self._lock:
+            for i, key in enumerate(keys):
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    scores[i] = self._cache[key]
+        missing = [i for i, score in enumerate(scores) if score is None]
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start : start + self.batch_size]
+            logits = self._predict([(query, documents[i].page_content) for i in batch])
+            with self._lock:
+                for i, logit in zip(batch, logits):
+                    scores[i] = float(logit)
+                    self._cache[keys[i]] = scores[i]
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return scores
+
+    def compress_documents(
+        self,
+        documents: Sequence[Document],
+        query: str,
+        callbacks: Optional[Callbacks] = None,
+    ) -> Sequence[Document]:
+        if not documents:
+            return []
+        scores = self.score(query, documents)
+        results = []
+        used_tokens = 0
+        for i in np.argsort(scores)[::-1][: self.top_n]:
+            doc = documents[int(i)]
+            if self.max_tokens is not None:
+                tokens = count_tokens(doc.page_content)
+                # 최소 1개의 chunk 는 남기고, 토큰 예산을 넘으면 중단합니다.
+                if results and used_tokens + tokens > self.max_tokens:
+                    break
+                used_tokens += tokens
+            results.append(
+                Document(
+                    id=doc.id,
+                    page_content=doc.page_content,
+                    metadata={**doc.metadata, "relevance_score": scores[int(i)]},
+                )
+            )
+        return results
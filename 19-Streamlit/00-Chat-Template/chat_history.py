@@ -4,6 +4,7 @@ from langchain_core.messages import ChatMessage
 from langchain_core.prompts import PromptTemplate
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import load_prompt
+from stream_renderer import render_stream
 
 
 st.set_page_config(page_title="나만의 ChatGPT 💬", page_icon="💬")
@@ -68,8 +69,6 @@ if user_input := st.chat_input():
         stream_response = st.session_state["chain"].stream(
             {"question": user_input}
         )  # 문서에 대한 질의
-        ai_answer = ""
-        for chunk in stream_response:
-            ai_answer += chunk
-            chat_container.markdown(ai_answer)
+        # 토큰을 모아 50ms 간격으로 출력합니다.
+        ai_answer = render_stream(chat_container, stream_response)
         add_history("ai", ai_answer)
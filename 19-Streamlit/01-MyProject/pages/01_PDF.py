@@ -3,13 +3,16 @@ from langchain_core.messages.chat import ChatMessage
 from langchain_openai import ChatOpenAI
 from langchain_core.output_parsers import StrOutputParser
 from langchain_teddynote.prompts import load_prompt
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import PDFPlumberLoader
-from langchain_community.vectorstores import FAISS
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnablePassthrough
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langchain_teddynote import logging
+from retriever_cache import IngestionRetriever, get_retriever_cache
+from stream_renderer import render_stream
+from retriever import create_ingestion_job
+from ingest_jobs import format_progress, get_ingestion_jobs
+from uploads import save_upload, upload_hash
+from functools import partial
 from dotenv import load_dotenv
 import os
 
@@ -66,34 +69,44 @@ def add_message(role, message):
     st.session_state["messages"].append(ChatMessage(role=role, content=message))
 
 
-# 파일을 캐시 저장(시간이 오래 걸리는 작업을 처리할 예정)
-@st.cache_resource(show_spinner="업로드한 파일을 처리 중입니다...")
 def embed_file(file):
-    # 업로드한 파일을 캐시 디렉토리에 저장합니다.
-    file_content = file.read()
-    file_path = f"./.cache/files/{file.name}"
-    with open(file_path, "wb") as f:
-        f.write(file_content)
-
-    # 단계 1: 문서 로드(Load Documents)
-    loader = PDFPlumberLoader(file_path)
-    docs = loader.load()
-
-    # 단계 2: 문서 분할(Split Documents)
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=50)
-    split_documents = text_splitter.split_documents(docs)
-
-    # 단계 3: 임베딩(Embedding) 생성
-    embeddings = OpenAIEmbeddings()
-
-    # 단계 4: DB 생성(Create DB) 및 저장
-    # 벡터스토어를 생성합니다.
-    vectorstore = FAISS.from_documents(documents=split_documents, embedding=embeddings)
-
-    # 단계 5: 검색기(Retriever) 생성
-    # 문서에 포함되어 있는 정보를 검색하고 생성합니다.
-    retriever = vectorstore.as_retriever()
-    return retriever
+    # 같은 내용의 파일은 모든 세션이 메모리의 인덱스 하나를 공유합니다.
+    # 인덱스는 .cache/embeddings 에도 저장되어 앱을 다시 시작해도 재사용됩니다.
+    cache = get_retriever_cache()
+    key = upload_hash(file)
+    lease = st.session_state.get("index_lease")
+    if lease is None or lease.key != key or lease.released:
+        if lease is not None:
+            # 이전에 업로드한 문서의 인덱스는 반납합니다.
+            lease.release()
+        lease = cache.acquire(key)
+        st.session_state["index_lease"] = lease
+    if lease is not None:
+        # 단계 5: 검색기(Retriever) 생성
+        # 문서에 포함되어 있는 정보를 검색하고 생성합니다.
+        return lease.as_retriever(), None
+
+    # 인덱스가 없으면 백그라운드에서 색인하고, 색인이 끝난 페이지부터 검색합니다.
+    file_path, _ = save_upload(file, cache.files_dir, key=key)
+    job = get_ingestion_jobs().submit(
+        create_ingestion_job(
+            key, file_path, cache.embeddings, on_complete=partial(cache.put, key)
+        )
+    )
+    return IngestionRetriever(cache=cache, job=job), job
+
+
+# 색인 진행 상황을 1초마다 갱신합니다.
+@st.fragment(run_every=1)
+def show_ingestion_progress(job):
+    progress = job.progress()
+    if progress["stage"] == "done":
+        # 색인이 끝나면 저장된 인덱스를 사용하도록 페이지를 다시 실행합니다.
+        st.rerun()
+    elif progress["stage"] == "error":
+        st.error(format_progress(progress))
+    else:
+        st.progress(progress["fraction"], text=format_progress(progress))
 
 
 # 체인 생성
@@ -119,9 +132,12 @@ def create_chain(retriever, model_name="gpt-4o"):
 # 파일이 업로드 되었을 때
 if uploaded_file:
     # 파일 업로드 후 retriever 생성 (작업시간이 오래 걸릴 예정...)
-    retriever = embed_file(uploaded_file)
+    retriever, job = embed_file(uploaded_file)
     chain = create_chain(retriever, model_name=selected_model)
     st.session_state["chain"] = chain
+    st.session_state["ingestion_job"] = job
+    if job is not None:
+        show_ingestion_progress(job)
 
 # 초기화 버튼이 눌리면...
 if clear_btn:
@@ -144,16 +160,18 @@ if user_input:
     if chain is not None:
         # 사용자의 입력
         st.chat_message("user").write(user_input)
+        job = st.session_state.get("ingestion_job")
+        if job is not None and not job.done:
+            # 색인 중에는 지금까지 색인된 페이지에서만 검색합니다.
+            st.caption(f"{job.pages_done}/{job.total_pages} 페이지에서 검색합니다.")
         # 스트리밍 호출
         response = chain.stream(user_input)
         with st.chat_message("assistant"):
             # 빈 공간(컨테이너)을 만들어서, 여기에 토큰을 스트리밍 출력한다.
             container = st.empty()
 
-            ai_answer = ""
-            for token in response:
-                ai_answer += token
-                container.markdown(ai_answer)
+            # 토큰을 모아 50ms 간격으로 출력합니다.
+            ai_answer = render_stream(container, response)
 
         # 대화기록을 저장한다.
         add_message("user", user_input)
@@ -11,7 +11,12 @@ from langchain_ollama import ChatOllama
 from langchain_teddynote import logging
 from dotenv import load_dotenv
 import os
-from retriever import create_retriever
+from retriever import create_ingestion_job
+from retriever_cache import IngestionRetriever, get_retriever_cache
+from stream_renderer import render_stream
+from ingest_jobs import format_progress, get_ingestion_jobs
+from uploads import save_upload, upload_hash
+from functools import partial
 
 # API KEY 정보로드
 load_dotenv()
@@ -64,16 +69,42 @@ def add_message(role, message):
     st.session_state["messages"].append(ChatMessage(role=role, content=message))
 
 
-# 파일을 캐시 저장(시간이 오래 걸리는 작업을 처리할 예정)
-@st.cache_resource(show_spinner="업로드한 파일을 처리 중입니다...")
 def embed_file(file):
-    # 업로드한 파일을 캐시 디렉토리에 저장합니다.
-    file_content = file.read()
-    file_path = f"./.cache/files/{file.name}"
-    with open(file_path, "wb") as f:
-        f.write(file_content)
-
-    return create_retriever(file_path)
+    # 같은 내용의 파일은 모든 세션이 메모리의 인덱스 하나를 공유합니다.
+    # 인덱스는 .cache/embeddings 에도 저장되어 앱을 다시 시작해도 재사용됩니다.
+    cache = get_retriever_cache()
+    key = upload_hash(file)
+    lease = st.session_state.get("index_lease")
+    if lease is None or lease.key != key or lease.released:
+        if lease is not None:
+            # 이전에 업로드한 문서의 인덱스는 반납합니다.
+            lease.release()
+        lease = cache.acquire(key)
+        st.session_state["index_lease"] = lease
+    if lease is not None:
+        return lease.as_retriever(), None
+
+    # 인덱스가 없으면 백그라운드에서 색인하고, 색인이 끝난 페이지부터 검색합니다.
+    file_path, _ = save_upload(file, cache.files_dir, key=key)
+    job = get_ingestion_jobs().submit(
+        create_ingestion_job(
+            key, file_path, cache.embeddings, on_complete=partial(cache.put, key)
+        )
+    )
+    return IngestionRetriever(cache=cache, job=job), job
+
+
+# 색인 진행 상황을 1초마다 갱신합니다.
+@st.fragment(run_every=1)
+def show_ingestion_progress(job):
+    progress = job.progress()
+    if progress["stage"] == "done":
+        # 색인이 끝나면 저장된 인덱스를 사용하도록 페이지를 다시 실행합니다.
+        st.rerun()
+    elif progress["stage"] == "error":
+        st.error(format_progress(progress))
+    else:
+        st.progress(progress["fraction"], text=format_progress(progress))
 
 
 def format_doc(document_list):
@@ -115,9 +146,12 @@ def create_chain(retriever, model_name="xionic"):
 # 파일이 업로드 되었을 때
 if uploaded_file:
     # 파일 업로드 후 retriever 생성 (작업시간이 오래 걸릴 예정...)
-    retriever = embed_file(uploaded_file)
+    retriever, job = embed_file(uploaded_file)
     chain = create_chain(retriever, model_name=selected_model)
     st.session_state["chain"] = chain
+    st.session_state["ingestion_job"] = job
+    if job is not None:
+        show_ingestion_progress(job)
 
 # 초기화 버튼이 눌리면...
 if clear_btn:
@@ -140,16 +174,18 @@ if user_input:
     if chain is not None:
         # 사용자의 입력
         st.chat_message("user").write(user_input)
+        job = st.session_state.get("ingestion_job")
+        if job is not None and not job.done:
+            # 색인 중에는 지금까지 색인된 페이지에서만 검색합니다.
+            st.caption(f"{job.pages_done}/{job.total_pages} 페이지에서 검색합니다.")
         # 스트리밍 호출
         response = chain.stream(user_input)
         with st.chat_message("assistant"):
             # 빈 공간(컨테이너)을 만들어서, 여기에 토큰을 스트리밍 출력한다.
             container = st.empty()
 
-            ai_answer = ""
-            for token in response:
-                ai_answer += token
-                container.markdown(ai_answer)
+            # 토큰을 모아 50ms 간격으로 출력합니다.
+            ai_answer = render_stream(container, response)
 
         # 대화기록을 저장한다.
         add_message("user", user_input)
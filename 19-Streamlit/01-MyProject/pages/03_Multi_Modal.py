@@ -2,8 +2,10 @@ import streamlit as st
 from langchain_core.messages.chat import ChatMessage
 from langchain_openai import ChatOpenAI
 from langchain_teddynote import logging
+from stream_renderer import render_stream
 from langchain_teddynote.models import MultiModal
 
+from uploads import save_upload
 from dotenv import load_dotenv
 import os
 
@@ -69,13 +71,8 @@ def add_message(role, message):
 # 이미지을 캐시 저장(시간이 오래 걸리는 작업을 처리할 예정)
 @st.cache_resource(show_spinner="업로드한 이미지를 처리 중입니다...")
 def process_imagefile(file):
-    # 업로드한 파일을 캐시 디렉토리에 저장합니다.
-    file_content = file.read()
-    file_path = f"./.cache/files/{file.name}"
-
-    with open(file_path, "wb") as f:
-        f.write(file_content)
-
+    # 업로드한 파일을 chunk 단위로 캐시 디렉토리에 저장합니다. (같은 내용이면 건너뜀)
+    file_path, _ = save_upload(file, "./.cache/files")
     return file_path
 
 
@@ -134,10 +131,8 @@ if user_input:
             # 빈 공간(컨테이너)을 만들어서, 여기에 토큰을 스트리밍 출력한다.
             container = st.empty()
 
-            ai_answer = ""
-            for token in response:
-                ai_answer += token.content
-                container.markdown(ai_answer)
+            # 토큰을 모아 50ms 간격으로 출력합니다.
+            ai_answer = render_stream(container, (token.content for token in response))
 
         # 대화기록을 저장한다.
         add_message("user", user_input)
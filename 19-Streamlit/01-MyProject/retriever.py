@@ -1,26 +1,29 @@
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import PDFPlumberLoader
-from langchain_community.vectorstores import FAISS
+from pdf_cache import PDFExtractionCache, PDFPageLoader, count_pages
 from langchain_openai import OpenAIEmbeddings
+from embedding_cache import CachedEmbeddings
+from ingest_jobs import IngestionJob
 
 
-def create_retriever(file_path):
-    # 단계 1: 문서 로드(Load Documents)
-    loader = PDFPlumberLoader(file_path)
-    docs = loader.load()
+def create_embeddings():
+    # 동일한 chunk 는 캐시된 임베딩을 재사용합니다.
+    return CachedEmbeddings(OpenAIEmbeddings())
 
-    # 단계 2: 문서 분할(Split Documents)
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=50)
-    split_documents = text_splitter.split_documents(docs)
 
-    # 단계 3: 임베딩(Embedding) 생성
-    embeddings = OpenAIEmbeddings()
-
-    # 단계 4: DB 생성(Create DB) 및 저장
-    # 벡터스토어를 생성합니다.
-    vectorstore = FAISS.from_documents(documents=split_documents, embedding=embeddings)
-
-    # 단계 5: 검색기(Retriever) 생성
-    # 문서에 포함되어 있는 정보를 검색하고 생성합니다.
-    retriever = vectorstore.as_retriever()
-    return retriever
+def create_ingestion_job(key, file_path, embeddings, on_complete=None):
+    # 단계 1~4 를 페이지 batch 단위로 실행하는 백그라운드 색인 작업을 만듭니다.
+    # 색인이 끝난 페이지부터 검색할 수 있습니다. (IngestionJobs.submit 으로 실행)
+    # 추출한 페이지는 작업이 끝날 때 캐시(PDF 해시 기준)에 한 번만 저장합니다.
+    load_pages = PDFPageLoader(PDFExtractionCache())
+    return IngestionJob(
+        key,
+        [file_path],
+        load_pages=load_pages,
+        count_pages=lambda path: count_pages(path, "pdfplumber"),
+        text_splitter=RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=50),
+        embeddings=embeddings,
+        on_complete=on_complete,
+        on_finish=load_pages.flush,
+        # 완료된 인덱스를 on_complete 로 캐시에 넘기면, 작업은 인덱스를 놓습니다.
+        keep_vectorstore=on_complete is None,
+    )
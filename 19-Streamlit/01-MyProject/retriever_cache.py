@@ -0,0 +1,208 @@
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+import streamlit as st
+
+from retriever import create_embeddings
+
+
+def _index_bytes(vectorstore: FAISS) -> int:
+    # FAISS 인덱스가 차지하는 메모리(float32 벡터 기준)를 추정합니다.
+    return vectorstore.index.ntotal * vectorstore.index.d * 4
+
+
+class IndexLease:
+    """세션이 사용 중인 인덱스에 대한 참조입니다.
+
+    lease 가 남아 있는 인덱스는 메모리에서 내리지 않습니다. release() 를 호출하거나
+    lease 를 가진 세션이 사라지면(가비지 컬렉션) 자동으로 반납됩니다.
+    """
+
+    def __init__(self, cache: "RetrieverCache", key: str, vectorstore: FAISS):
+        self.key = key
+        self.vectorstore = vectorstore
+        self._finalizer = weakref.finalize(self, cache.release, key)
+
+    @property
+    def released(self) -> bool:
+        return not self._finalizer.alive
+
+    def release(self):
+        self._finalizer()
+
+    def as_retriever(self, k: int = 4) -> "SharedIndexRetriever":
+        return SharedIndexRetriever(lease=self, k=k)
+
+
+class SharedIndexRetriever(BaseRetriever):
+    """여러 세션이 공유하는 인덱스에서 검색하는 retriever 입니다.
+
+    FAISS 검색은 읽기만 하므로 lock 없이 여러 세션에서 동시에 실행됩니다.
+    """
+
+    lease: Any
+    k: int = 4
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        return self.lease.vectorstore.similarity_search(query, k=self.k)
+
+
+class IngestionRetriever(BaseRetriever):
+    """색인 중에는 작업(job)에서 검색하고, 색인이 끝나면 캐시의 인덱스(lease)에서 검색합니다.
+
+    완료된 작업은 인덱스를 캐시에 넘기고 놓으므로, 메모리에는 캐시의 max_items/max_bytes
+    제한을 받는 인덱스만 남습니다.
+    """
+
+    cache: Any
+    job: Any
+    k: int = 4
+    lease: Optional[IndexLease] = None
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        if self.lease is None and self.job.done:
+            self.lease = self.cache.acquire(self.job.key)
+        if self.lease is not None:
+            return self.lease.vectorstore.similarity_search(query, k=self.k)
+        return self.job.similarity_search(query, k=self.k)
+
+
+class RetrieverCache:
+    """파일 내용(SHA-256)을 키로 FAISS 인덱스를 디스크와 메모리(LRU)에 캐시합니다.
+
+    - 같은 내용의 파일은 파일 이름이 달라도 같은 인덱스를 재사용합니다.
+    - 인덱스는 cache_dir/<hash> 에 저장되어, 앱을 다시 시작해도 재사용됩니다.
+    - 메모리에는 최대 max_items 개, max_bytes 이하의 인덱스만 유지합니다.
+    - acquire() 로 받은 lease 가 있는 인덱스는 내리지 않으므로, 같은 문서를 여러
+      세션이 사용해도 메모리에는 하나만 올라갑니다.
+    """
+
+    def __init__(
+        self,
+        embeddings,
+        cache_dir: str = ".cache/embeddings",
+        files_dir: str = ".cache/files",
+        max_items: int = 4,
+        max_bytes: Optional[int] = 512 * 1024 * 1024,
+    ):
+        self.embeddings = embeddings
+        self.cache_dir = cache_dir
+        self.files_dir = files_dir
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self._loaded = OrderedDict()
+        self._lock = threading.Lock()
+        # 키별 사용 중인 lease 수
+        self._refcounts: Dict[str, int] = {}
+        # 같은 파일을 동시에 임베딩하거나 불러오지 않도록 키별 lock 을 사용합니다.
+        self._key_locks = {}
+        os.makedirs(cache_dir, exist_ok=True)
+        os.makedirs(files_dir, exist_ok=True)
+
+    def _key_lock(self, key: str) -> threading.RLock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.RLock())
+
+    def _evict(self):
+        # self._lock 을 잡은 상태에서 호출합니다.
+        # 가장 오래 사용하지 않은 인덱스부터 메모리에서 내립니다. (디스크에는 남습니다.)
+        # 세션이 사용 중인 인덱스와 가장 최근에 사용한 인덱스는 남깁니다.
+        total = sum(_index_bytes(v) for v in self._loaded.values())
+        for key in list(self._loaded)[:-1]:
+            if len(self._loaded) <= self.max_items and (
+                self.max_bytes is None or total <= self.max_bytes
+            ):
+                break
+            if self._refcounts.get(key):
+                continue
+            total -= _index_bytes(self._loaded.pop(key))
+
+    def _remember(self, key: str, vectorstore: FAISS) -> FAISS:
+        with self._lock:
+            # 다른 세션이 먼저 올린 인덱스가 있으면 그것을 사용합니다.
+            vectorstore = self._loaded.setdefault(key, vectorstore)
+            self._loaded.move_to_end(key)
+            self._evict()
+        return vectorstore
+
+    def _save(self, key: str, vectorstore: FAISS):
+        # 임시 폴더에 저장한 뒤 이름을 바꿔, 저장 중인 인덱스를 읽지 않게 합니다.
+        tmp_dir = tempfile.mkdtemp(dir=self.cache_dir, prefix=".tmp-")
+        vectorstore.save_local(tmp_dir)
+        try:
+            os.rename(tmp_dir, os.path.join(self.cache_dir, key))
+        except OSError:
+            # 다른 세션이 먼저 저장한 경우
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def lookup(self, key: str) -> Optional[FAISS]:
+        """메모리 → 디스크 순서로 찾고, 없으면 None 을 반환합니다."""
+        with self._lock:
+            if key in self._loaded:
+                self._loaded.move_to_end(key)
+                return self._loaded[key]
+        with self._key_lock(key):
+            with self._lock:
+                if key in self._loaded:
+                    return self._loaded[key]
+            index_dir = os.path.join(self.cache_dir, key)
+            if not os.path.exists(os.path.join(index_dir, "index.faiss")):
+                return None
+            vectorstore = FAISS.load_local(
+                index_dir, self.embeddings, allow_dangerous_deserialization=True
+            )
+            return self._remember(key, vectorstore)
+
+    def acquire(self, key: str) -> Optional[IndexLease]:
+        """인덱스를 찾아 lease 를 반환합니다. 인덱스가 없으면 None 을 반환합니다."""
+        vectorstore = self.lookup(key)
+        if vectorstore is None:
+            return None
+        with self._lock:
+            self._refcounts[key] = self._refcounts.get(key, 0) + 1
+            # lookup 직후 메모리에서 내려간 경우 다시 올립니다.
+            vectorstore = self._loaded.setdefault(key, vectorstore)
+            self._loaded.move_to_end(key)
+        return IndexLease(self, key, vectorstore)
+
+    def release(self, key: str):
+        with self._lock:
+            count = self._refcounts.get(key, 0) - 1
+            if count > 0:
+                self._refcounts[key] = count
+            else:
+                self._refcounts.pop(key, None)
+            self._evict()
+
+    def stats(self) -> Dict[str, Any]:
+        """메모리에 올라간 인덱스 수, 추정 크기(bytes), 키별 lease 수를 반환합니다."""
+        with self._lock:
+            return {
+                "loaded": len(self._loaded),
+                "bytes": sum(_index_bytes(v) for v in self._loaded.values()),
+                "leases": dict(self._refcounts),
+            }
+
+    def put(self, key: str, vectorstore: FAISS) -> FAISS:
+        """새로 만든 인덱스를 디스크와 메모리에 저장합니다."""
+        self._save(key, vectorstore)
+        return self._remember(key, vectorstore)
+
+
+# 모든 페이지와 세션이 공유하는 인덱스 저장소 (파일 내용의 해시를 키로 사용)
+@st.cache_resource
+def get_retriever_cache() -> RetrieverCache:
+    return RetrieverCache(create_embeddings())
@@ -0,0 +1,98 @@
+import argparse
+import json
+import os
+import time
+from typing import List
+
+# 토큰마다 다시 그리는 기존 방식과 StreamRenderer 를 같은 가짜 스트림으로 실행합니다.
+SCRIPT = """
+import sys
+import time
+
+import streamlit as st
+
+sys.path.insert(0, {path!r})
+from stream_renderer import render_stream
+
+
+def fake_stream():
+    for i in range({tokens}):
+        time.sleep({delay})
+        yield {token!r}
+
+
+container = st.empty()
+if {batched}:
+    render_stream(container, fake_stream(), interval={interval})
+else:
+    ai_answer = ""
+    for token in fake_stream():
+        ai_answer += token
+        container.markdown(ai_answer)
+"""
+
+
+def _run(script: str) -> dict:
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_string(script, default_timeout=600)
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    app.run()
+    return {
+        "cpu_seconds": time.process_time() - cpu_start,
+        "wall_seconds": time.perf_counter() - wall_start,
+        "answer_chars": len(app.markdown[0].value),
+    }
+
+
+def bench_stream(
+    num_tokens: List[int] = (500, 2000),
+    delay: float = 0.001,
+    token: str = "안녕하세요 ",
+    interval: float = 0.05,
+    repeats: int = 3,
+) -> List[dict]:
+    """답변 하나를 스트리밍할 때 서버 CPU 시간을 방식별로 비교합니다.
+
+    delay 는 LLM 이 토큰을 내보내는 간격(초)이며, 기다리는 시간은 CPU 시간에
+    포함되지 않습니다.
+    """
+    path = os.path.dirname(os.path.abspath(__file__))
+    results = []
+    for tokens in num_tokens:
+        result = {"tokens": tokens}
+        for name, batched in [("per_token", False), ("batched", True)]:
+            script = SCRIPT.format(
+                path=path,
+                tokens=tokens,
+                delay=delay,
+                token=token,
+                batched=batched,
+                interval=interval,
+            )
+            runs = [_run(script) for _ in range(repeats)]
+            result[name] = {
+                "cpu_seconds": min(run["cpu_seconds"] for run in runs),
+                "wall_seconds": min(run["wall_seconds"] for run in runs),
+                "answer_chars": runs[0]["answer_chars"],
+            }
+        result["cpu_speedup"] = (
+            result["per_token"]["cpu_seconds"] / result["batched"]["cpu_seconds"]
+        )
+        results.append(result)
+    return results
+
+
+if __name__ == "__main__":
+    # 예시: python stream_benchmark.py --options '{"num_tokens": [4000]}'
+    parser = argparse.ArgumentParser(description="스트리밍 출력 CPU 벤치마크")
+    parser.add_argument(
+        "--options", type=json.loads, default={}, help="벤치마크 함수 인자 (JSON)"
+    )
+    parser.add_argument("--output", default=None, help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+    report = json.dumps(bench_stream(**args.options), indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+    print(report)
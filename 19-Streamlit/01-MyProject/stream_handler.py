@@ -1,5 +1,7 @@
 import streamlit as st
 
+from stream_renderer import StreamRenderer
+
 
 def get_current_tool_message(tool_args, tool_call_id):
     if tool_call_id:
@@ -60,6 +62,9 @@ def stream_handler(streamlit_container, agent_executor, inputs, config):
                 )
                 if current_tool_message:
                     current_tool_message["tool_result"] = chunk_msg.content
+                    if agent_message is not None:
+                        # 도구 결과보다 앞선 답변을 먼저 출력합니다.
+                        agent_message.flush()
                     with st.status(f'✅ {current_tool_message["tool_name"]}'):
                         if current_tool_message["tool_name"] == "web_search":
                             st.markdown(
@@ -71,9 +76,12 @@ def stream_handler(streamlit_container, agent_executor, inputs, config):
             if metadata["langgraph_node"] == "agent":
                 if chunk_msg.content:
                     if agent_message is None:
-                        agent_message = st.empty()
+                        # 토큰을 모아 50ms 간격으로 출력합니다.
+                        agent_message = StreamRenderer(st.empty())
                     # 에이전트 메시지 누적
-                    agent_answer += chunk_msg.content
-                    agent_message.markdown(agent_answer)
+                    agent_message.write(chunk_msg.content)
 
+        if agent_message is not None:
+            agent_message.flush()
+            agent_answer = agent_message.text
         return container, tool_args, agent_answer
@@ -0,0 +1,64 @@
+import time
+from typing import Iterable, List
+
+
+class StreamRenderer:
+    """스트리밍 토큰을 리스트에 모아 두었다가 일정 간격으로 한 번에 출력합니다.
+
+    토큰마다 문자열을 이어 붙이고 container.markdown() 을 호출하면, 답변 길이 n 에
+    대해 O(n²) 의 문자열 복사와 n 번의 전체 markdown 렌더링이 발생합니다.
+    StreamRenderer 는 interval 초가 지났거나 모인 글자 수가 flush_chars 이상일 때만
+    출력하므로, 렌더링 횟수가 토큰 수가 아니라 답변 시간에 비례합니다.
+    """
+
+    def __init__(self, container, interval: float = 0.05, flush_chars: int = 512):
+        self.container = container
+        self.interval = interval
+        self.flush_chars = flush_chars
+        self._parts: List[str] = []
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    def write(self, token: str):
+        if not token:
+            return
+        self._parts.append(token)
+        self._pending += len(token)
+        if (
+            self._pending >= self.flush_chars
+            or time.monotonic() - self._last_flush >= self.interval
+        ):
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            text = self.text
+            # 다음 join 이 짧도록 지금까지의 조각을 하나로 합쳐 둡니다.
+            self._parts = [text]
+            self.container.markdown(text)
+            self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        # 마지막으로 남은 토큰을 출력합니다.
+        self.flush()
+
+
+def render_stream(
+    container,
+    stream: Iterable[str],
+    interval: float = 0.05,
+    flush_chars: int = 512,
+) -> str:
+    """stream 의 토큰을 interval 초 간격으로 container 에 출력하고, 전체 답변을 반환합니다."""
+    with StreamRenderer(container, interval, flush_chars) as renderer:
+        for token in stream:
+            renderer.write(token)
+    return renderer.text
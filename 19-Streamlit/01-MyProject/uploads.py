@@ -0,0 +1,73 @@
+import hashlib
+import os
+import tempfile
+from typing import Optional, Tuple
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def _chunks(file, chunk_size: int = CHUNK_SIZE):
+    """업로드 파일을 chunk_size 단위로 내보냅니다.
+
+    Streamlit 의 UploadedFile(BytesIO) 은 getbuffer() 로 복사 없이 읽습니다.
+    """
+    if hasattr(file, "getbuffer"):
+        buffer = file.getbuffer()
+        try:
+            for start in range(0, len(buffer), chunk_size):
+                yield buffer[start : start + chunk_size]
+        finally:
+            buffer.release()
+        return
+    file.seek(0)
+    for block in iter(lambda: file.read(chunk_size), b""):
+        yield block
+
+
+def upload_hash(file, chunk_size: int = CHUNK_SIZE) -> str:
+    """업로드 파일 내용의 SHA-256 해시를 chunk 단위로 계산합니다."""
+    h = hashlib.sha256()
+    for block in _chunks(file, chunk_size):
+        h.update(block)
+    return h.hexdigest()
+
+
+def save_upload(
+    file,
+    directory: str = ".cache/files",
+    key: Optional[str] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Tuple[str, str]:
+    """업로드 파일을 directory/<sha256><확장자> 로 저장하고 (경로, 해시) 를 반환합니다.
+
+    - 같은 해시의 파일이 이미 있으면 쓰지 않습니다.
+    - 임시 파일에 chunk 단위로 쓰면서 해시를 계산하고, 마지막에 이름을 바꿉니다.
+    """
+    os.makedirs(directory, exist_ok=True)
+    extension = os.path.splitext(file.name)[1]
+    if key is None and hasattr(file, "getbuffer"):
+        # 메모리에 있는 업로드는 먼저 해시만 계산해, 이미 있으면 쓰기를 건너뜁니다.
+        key = upload_hash(file, chunk_size)
+    if key is not None:
+        file_path = os.path.join(directory, key + extension)
+        if os.path.exists(file_path):
+            return file_path, key
+
+    h = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for block in _chunks(file, chunk_size):
+                h.update(block)
+                f.write(block)
+        key = h.hexdigest()
+        file_path = os.path.join(directory, key + extension)
+        if os.path.exists(file_path):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return file_path, key
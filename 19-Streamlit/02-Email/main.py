@@ -9,6 +9,7 @@ from langchain_core.output_parsers import PydanticOutputParser
 from langchain_openai import ChatOpenAI
 from langchain_community.utilities import SerpAPIWrapper
 from langchain_teddynote.prompts import load_prompt
+from stream_renderer import render_stream
 
 
 # 검색을 위한 API KEY 설정
@@ -144,10 +145,8 @@ if user_input:
         # 빈 공간(컨테이너)을 만들어서, 여기에 토큰을 스트리밍 출력한다.
         container = st.empty()
 
-        ai_answer = ""
-        for token in response:
-            ai_answer += token
-            container.markdown(ai_answer)
+        # 토큰을 모아 50ms 간격으로 출력합니다.
+        ai_answer = render_stream(container, response)
 
     # 대화기록을 저장한다.
     add_message("user", user_input)
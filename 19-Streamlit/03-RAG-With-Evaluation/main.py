@@ -1,6 +1,8 @@
 import streamlit as st
 from langchain_core.messages.chat import ChatMessage
 from rag.pdf import PDFRetrievalChain
+from rag.jobs import IngestionJobs, format_progress
+from stream_renderer import render_stream
 from langchain_teddynote import logging
 from rag.evaluation import RagEvaluator
 from dotenv import load_dotenv
@@ -92,15 +94,43 @@ def embed_file(file):
     return file_path
 
 
+# 세션 사이에 공유되는 색인 작업 관리자 (백그라운드 스레드 풀 + 작업 테이블)
+@st.cache_resource
+def get_ingestion_jobs():
+    return IngestionJobs(max_workers=2)
+
+
 # 체인 생성
 def create_rag_chain(file_path):
     # PDF 문서를 로드
-    pdf = PDFRetrievalChain([file_path]).create_chain()
+    # 동일한 파일은 .cache/embeddings 에 저장된 인덱스를 재사용합니다.
+    pdf = PDFRetrievalChain(
+        [file_path],
+        index_cache_dir=".cache/embeddings",
+        embedding_cache_path=".cache/embedding_cache.db",
+        extraction_cache_dir=".cache/pdf_text",
+    )
+
+    # 저장된 인덱스가 없으면 백그라운드에서 색인하고, 색인이 끝난 페이지부터 검색합니다.
+    job = get_ingestion_jobs().submit(pdf.create_ingestion_job())
 
     # retriever 와 chain을 생성
-    pdf_retriever = pdf.retriever
-    pdf_chain = pdf.chain
-    return pdf_retriever, pdf_chain
+    pdf_retriever = job.as_retriever(k=pdf.k)
+    pdf_chain = pdf.create_answer_chain()
+    return pdf_retriever, pdf_chain, job
+
+
+# 색인 진행 상황을 1초마다 갱신합니다.
+@st.fragment(run_every=1)
+def show_ingestion_progress(job):
+    progress = job.progress()
+    if progress["stage"] == "done":
+        # 색인이 끝나면 진행 표시를 지우도록 페이지를 다시 실행합니다.
+        st.rerun()
+    elif progress["stage"] == "error":
+        st.error(format_progress(progress))
+    else:
+        st.progress(progress["fraction"], text=format_progress(progress))
 
 
 # 파일이 업로드 되었을 때
@@ -108,9 +138,17 @@ if uploaded_file:
     # 파일 임베딩
     file_path = embed_file(uploaded_file)
     # RAG 체인 생성
-    retriever, chain = create_rag_chain(file_path)
-    st.session_state["retriever"] = retriever
-    st.session_state["chain"] = chain
+    # 같은 업로드 파일이면 rerun 마다 PDF 해시 계산과 인덱스 로드를 반복하지 않도록
+    # 세션에 저장된 체인을 재사용합니다.
+    if st.session_state.get("rag_file_id") != uploaded_file.file_id:
+        retriever, chain, job = create_rag_chain(file_path)
+        st.session_state["retriever"] = retriever
+        st.session_state["chain"] = chain
+        st.session_state["ingestion_job"] = job
+        st.session_state["rag_file_id"] = uploaded_file.file_id
+    job = st.session_state["ingestion_job"]
+    if job.stage != "done":
+        show_ingestion_progress(job)
 
 # 초기화 버튼이 눌리면...
 if clear_btn:
@@ -135,6 +173,10 @@ if user_input:
     if chain is not None and retriever is not None:
         # 사용자의 입력
         st.chat_message("user").write(user_input)
+        job = st.session_state.get("ingestion_job")
+        if job is not None and not job.done:
+            # 색인 중에는 지금까지 색인된 페이지에서만 검색합니다.
+            st.caption(f"{job.pages_done}/{job.total_pages} 페이지에서 검색합니다.")
         # 스트리밍 호출
         context = retriever.invoke(user_input)
         response = chain.stream(
@@ -147,10 +189,8 @@ if user_input:
             # 빈 공간(컨테이너)을 만들어서, 여기에 토큰을 스트리밍 출력한다.
             container = st.empty()
 
-            ai_answer = ""
-            for token in response:
-                ai_answer += token
-                container.markdown(ai_answer)
+            # 토큰을 모아 50ms 간격으로 출력합니다.
+            ai_answer = render_stream(container, response)
 
             # RAGAS 평가를 위한 결과 저장
             evaluator.add_sample(user_input, ai_answer, context)
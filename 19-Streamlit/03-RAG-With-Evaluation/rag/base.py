@@ -1,10 +1,30 @@
 from langchain_core.output_parsers import StrOutputParser
 from langchain_community.vectorstores import FAISS
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 
 from abc import ABC, abstractmethod
+import asyncio
+import os
+import shutil
+import tempfile
+import time
 from operator import itemgetter
-from langchain import hub
+from rag.index_cache import FAISSIndexCache
+from rag.incremental import IncrementalIndexer
+from rag.ingest import stream_ingest
+from rag.embeddings import ConcurrentEmbeddings
+from rag.embedding_cache import CachedEmbeddings, get_embedding_store
+from rag.semantic_cache import SemanticCache
+from rag import ann
+from rag.compact import CompactVectorStore
+from rag.hybrid import HybridRetriever
+from rag.mmr import MMRRetriever
+from rag.rerank import OnnxCrossEncoderReranker
+from langchain.retrievers import ContextualCompressionRetriever
+from langchain_core.runnables import RunnableLambda
+from rag.utils import format_docs
+from rag.batch import answer_batch, batch_similarity_search
+from rag.prompt_cache import pull_prompt
+from rag.clients import get_chat_model, get_embeddings
 
 
 class RetrievalChain(ABC):
@@ -12,12 +32,81 @@ class RetrievalChain(ABC):
         self.source_uri = kwargs.get("source_uri", None)
         self.k = kwargs.get("k", 6)
         self.embeddings = kwargs.get("embeddings", None)
+        # 인덱스 캐시 폴더 (None 이면 캐시를 사용하지 않습니다.)
+        self.index_cache_dir = kwargs.get("index_cache_dir", None)
+        self.index_cache_max_entries = kwargs.get("index_cache_max_entries", 8)
+        self.index_cache_max_bytes = kwargs.get("index_cache_max_bytes", None)
+        # 증분 색인 폴더 (지정하면 변경된 파일만 다시 임베딩합니다.)
+        self.index_dir = kwargs.get("index_dir", None)
+        self.index_report = None
+        # 스트리밍 색인 설정 (load → split → embed → index 를 batch 단위로 처리)
+        self.streaming = kwargs.get("streaming", False)
+        self.batch_size = kwargs.get("batch_size", 64)
+        self.queue_size = kwargs.get("queue_size", 4)
+        # batch 동시 임베딩 설정 (max_batch_tokens, requests_per_minute 등)
+        self.concurrent_embedding = kwargs.get("concurrent_embedding", False)
+        self.embedding_options = kwargs.get("embedding_options", {})
+        # 임베딩 캐시 파일 경로 (None 이면 캐시를 사용하지 않습니다.)
+        self.embedding_cache_path = kwargs.get("embedding_cache_path", None)
+        # 의미 기반 답변 캐시 설정 (코사인 거리가 threshold 이하면 답변을 재사용)
+        self.semantic_cache = kwargs.get("semantic_cache", False)
+        self.semantic_cache_threshold = kwargs.get("semantic_cache_threshold", 0.05)
+        self.semantic_cache_max_entries = kwargs.get("semantic_cache_max_entries", 1000)
+        # 벡터 인덱스 종류 ("flat", "ivf", "hnsw", "ivfpq", "auto")
+        self.index_type = kwargs.get("index_type", "flat")
+        self.index_params = kwargs.get("index_params", {})
+        # 벡터 저장 형식 ("float32", "float16", "int8")
+        self.vector_storage = kwargs.get("vector_storage", "float32")
+        self.compact_dir = kwargs.get("compact_dir", ".cache/compact")
+        # 검색 방식 ("similarity", "mmr", "hybrid") 과 BM25 토크나이저
+        self.search_type = kwargs.get("search_type", "similarity")
+        self.tokenizer = kwargs.get("tokenizer", None)
+        # MMR 후보 개수와 다양성 가중치
+        self.fetch_k = kwargs.get("fetch_k", 20)
+        self.lambda_mult = kwargs.get("lambda_mult", 0.5)
+        # ONNX cross-encoder 재정렬 설정 (rerank_fetch_k 개를 검색한 뒤 k 개만 남깁니다.)
+        self.rerank_model_path = kwargs.get("rerank_model_path", None)
+        self.rerank_fetch_k = kwargs.get("rerank_fetch_k", 30)
+        self.rerank_max_tokens = kwargs.get("rerank_max_tokens", None)
+        # 프롬프트에 넣을 context 의 최대 토큰 수 (지정하면 중복 chunk 를 합치고
+        # 토큰 수에 맞춰 압축합니다. None 이면 검색 결과를 그대로 사용합니다.)
+        self.context_max_tokens = kwargs.get("context_max_tokens", None)
+        # hub 프롬프트 로컬 캐시 (prompt_max_age 초가 지나면 hub 에서 새로 받습니다.)
+        self.prompt_cache_dir = kwargs.get("prompt_cache_dir", ".cache/prompts")
+        self.prompt_max_age = kwargs.get("prompt_max_age", 86400)
+        if self.streaming and self.index_type != "flat":
+            # ANN 인덱스는 전체 벡터로 학습(train)해야 하므로 batch 단위로 만들 수 없습니다.
+            raise ValueError(
+                f"streaming 색인은 index_type={self.index_type!r} 를 지원하지 않습니다."
+            )
+        if self.index_dir is not None and self.index_type != "flat":
+            # 증분 색인은 chunk 를 개별 삭제하므로 flat 인덱스만 지원합니다.
+            raise ValueError(
+                f"증분 색인(index_dir)은 index_type={self.index_type!r} 를 지원하지 않습니다."
+            )
+        if self.vector_storage != "float32":
+            # 압축 저장소는 한 번에 생성만 할 수 있으므로 (add_texts 미지원)
+            # 증분/스트리밍 색인과 ANN 인덱스와 함께 사용할 수 없습니다.
+            for option, unsupported in [
+                ("index_dir", self.index_dir is not None),
+                ("streaming", self.streaming),
+                ("index_type", self.index_type != "flat"),
+            ]:
+                if unsupported:
+                    raise ValueError(
+                        f"vector_storage={self.vector_storage!r} 는 {option} 옵션과 "
+                        "함께 사용할 수 없습니다."
+                    )
 
     @abstractmethod
     def load_documents(self, source_uris):
         """loader를 사용하여 문서를 로드합니다."""
         pass
 
+    def lazy_load_documents(self, source_uris):
+        """문서를 하나씩 내보냅니다. (기본 구현은 load_documents 결과를 사용)"""
+        yield from self.load_documents(source_uris)
+
     @abstractmethod
     def create_text_splitter(self):
         """text splitter를 생성합니다."""
@@ -28,45 +117,303 @@ class RetrievalChain(ABC):
         return text_splitter.split_documents(docs)
 
     def create_embedding(self):
-        return OpenAIEmbeddings(model="text-embedding-3-small")
+        if self.embeddings is not None:
+            return self.embeddings
+        embeddings = get_embeddings("text-embedding-3-small")
+        if self.concurrent_embedding:
+            embeddings = ConcurrentEmbeddings(embeddings, **self.embedding_options)
+        if self.embedding_cache_path is not None or self.semantic_cache:
+            # 의미 캐시만 사용할 때는 질문 임베딩만 메모리에 캐시합니다.
+            store = get_embedding_store(self.embedding_cache_path or ":memory:")
+            embeddings = CachedEmbeddings(
+                embeddings,
+                store,
+                cache_documents=self.embedding_cache_path is not None,
+            )
+        # 한 번 만든 임베딩 객체는 이 chain 안에서 재사용합니다.
+        self.embeddings = embeddings
+        return embeddings
+
+    def compact_folder(self, text_splitter):
+        """원본 파일 + splitter + 임베딩 설정별 압축 저장소 폴더 경로를 반환합니다."""
+        key = FAISSIndexCache.make_key(
+            self.source_uri, text_splitter, self.create_embedding()
+        )
+        return os.path.join(self.compact_dir, f"{key}.{self.vector_storage}")
 
-    def create_vectorstore(self, split_docs):
+    def create_vectorstore(self, split_docs, folder_path=None):
+        if self.vector_storage != "float32":
+            # 양자화된 벡터 + memory-map 본문 저장소를 사용합니다.
+            os.makedirs(self.compact_dir, exist_ok=True)
+            # 임시 폴더에 저장한 뒤 이름을 바꿔, 저장 중인 폴더를 읽지 않게 합니다.
+            tmp_dir = tempfile.mkdtemp(dir=self.compact_dir, prefix=".tmp-")
+            vectorstore = CompactVectorStore.from_documents(
+                split_docs,
+                self.create_embedding(),
+                folder_path=tmp_dir,
+                quantization=self.vector_storage,
+            )
+            if folder_path is None:
+                return vectorstore
+            try:
+                os.rename(tmp_dir, folder_path)
+            except OSError:
+                # 다른 프로세스가 먼저 저장한 경우
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+            return CompactVectorStore(self.create_embedding(), folder_path)
+        if self.index_type != "flat":
+            # 근사 최근접 이웃(ANN) 인덱스를 사용합니다.
+            return ann.from_documents(
+                split_docs,
+                self.create_embedding(),
+                index_type=self.index_type,
+                **self.index_params,
+            )
         return FAISS.from_documents(
             documents=split_docs, embedding=self.create_embedding()
         )
 
-    def create_retriever(self, vectorstore):
-        # MMR을 사용하여 검색을 수행하는 retriever를 생성합니다.
+    def create_vectorstore_streaming(self, text_splitter):
+        """전체 문서를 메모리에 올리지 않고 batch 단위로 색인합니다."""
+        return stream_ingest(
+            self.lazy_load_documents(self.source_uri),
+            text_splitter,
+            self.create_embedding(),
+            batch_size=self.batch_size,
+            queue_size=self.queue_size,
+        )
+
+    def create_index_cache(self):
+        # 압축 저장소는 자체 폴더에 저장되므로 FAISS 인덱스 캐시를 사용하지 않습니다.
+        if self.index_cache_dir is None or self.vector_storage != "float32":
+            return None
+        return FAISSIndexCache(
+            cache_dir=self.index_cache_dir,
+            max_entries=self.index_cache_max_entries,
+            max_bytes=self.index_cache_max_bytes,
+        )
+
+    def update_index(self, source_uris=None):
+        """변경된 파일만 다시 색인하고, 변경 내역(report)을 반환합니다."""
+        if source_uris is not None:
+            self.source_uri = source_uris
+        text_splitter = self.create_text_splitter()
+        indexer = IncrementalIndexer(self.index_dir, self.create_embedding())
+        vectorstore = getattr(self, "vectorstore", None)
+        if vectorstore is None:
+            vectorstore = indexer.load_vectorstore()
+        self.vectorstore, self.index_report = indexer.update(
+            vectorstore,
+            self.source_uri,
+            lambda uris: self.split_documents(self.load_documents(uris), text_splitter),
+        )
+        return self.index_report
+
+    def load_or_create_vectorstore(self):
+        """캐시된 인덱스가 있으면 불러오고, 없으면 문서를 임베딩하여 생성합니다."""
+        if self.index_dir is not None:
+            self.update_index()
+            return self.vectorstore
+
+        text_splitter = self.create_text_splitter()
+        index_cache = self.create_index_cache()
+        if index_cache is not None:
+            embedding = self.create_embedding()
+            key = index_cache.make_key(self.source_uri, text_splitter, embedding)
+            vectorstore = index_cache.load(key, embedding)
+            if vectorstore is not None:
+                return vectorstore
+
+        folder_path = None
+        if self.vector_storage != "float32":
+            # 압축 저장소는 설정별 폴더에 저장하고, 폴더가 있으면 그대로 불러옵니다.
+            folder_path = self.compact_folder(text_splitter)
+            if os.path.exists(os.path.join(folder_path, "config.json")):
+                return CompactVectorStore(self.create_embedding(), folder_path)
+
+        if self.streaming:
+            vectorstore = self.create_vectorstore_streaming(text_splitter)
+        else:
+            docs = self.load_documents(self.source_uri)
+            split_docs = self.split_documents(docs, text_splitter)
+            vectorstore = self.create_vectorstore(split_docs, folder_path)
+        if index_cache is not None:
+            index_cache.save(key, vectorstore)
+        return vectorstore
+
+    def create_retriever(self, vectorstore, k=None):
+        k = k or self.k
+        if self.search_type == "hybrid":
+            # BM25 + dense 검색 결과를 RRF 로 합치는 retriever 를 생성합니다.
+            return HybridRetriever.from_vectorstore(
+                vectorstore, tokenizer=self.tokenizer, k=k, fetch_k=k * 2
+            )
+        if self.search_type == "mmr":
+            # MMR을 사용하여 검색을 수행하는 retriever를 생성합니다.
+            return MMRRetriever(
+                vectorstore=vectorstore,
+                k=k,
+                fetch_k=max(self.fetch_k, k),
+                lambda_mult=self.lambda_mult,
+            )
+        # 유사도(similarity) 검색을 수행하는 retriever를 생성합니다.
         dense_retriever = vectorstore.as_retriever(
-            search_type="similarity", search_kwargs={"k": self.k}
+            search_type="similarity", search_kwargs={"k": k}
         )
         return dense_retriever
 
+    def create_reranker(self):
+        return OnnxCrossEncoderReranker(
+            model_path=self.rerank_model_path,
+            top_n=self.k,
+            max_tokens=self.rerank_max_tokens,
+        )
+
+    def create_rerank_retriever(self, vectorstore):
+        """후보를 넉넉히 검색한 뒤 cross-encoder 로 재정렬하여 k 개만 남깁니다."""
+        return ContextualCompressionRetriever(
+            base_compressor=self.create_reranker(),
+            base_retriever=self.create_retriever(vectorstore, k=self.rerank_fetch_k),
+        )
+
     def create_model(self):
-        return ChatOpenAI(model="gpt-4.1-mini", temperature=0)
+        return get_chat_model("gpt-4.1-mini", temperature=0)
 
     def create_prompt(self):
-        return hub.pull("teddynote/rag-prompt")
+        return pull_prompt(
+            "teddynote/rag-prompt",
+            cache_dir=self.prompt_cache_dir,
+            max_age=self.prompt_max_age,
+            # hub 에 접속할 수 없고 캐시도 없으면 저장소에 포함된 프롬프트를 사용합니다.
+            fallback_path=os.path.join(
+                os.path.dirname(__file__), "prompts", "rag-prompt.yaml"
+            ),
+        )
 
-    @staticmethod
-    def format_docs(docs):
-        return "\n".join(docs)
+    def format_docs(self, docs):
+        # context_max_tokens 가 없으면 context 를 그대로 프롬프트에 전달합니다.
+        if self.context_max_tokens is None:
+            return docs
+        # 검색된 Document 리스트는 토큰 예산에 맞춰 압축한 뒤 문자열로 변환합니다.
+        if isinstance(docs, str):
+            return docs
+        if docs and all(isinstance(doc, str) for doc in docs):
+            return "\n".join(docs)
+        return format_docs(docs, max_tokens=self.context_max_tokens)
 
     def create_chain(self):
-        docs = self.load_documents(self.source_uri)
-        text_splitter = self.create_text_splitter()
-        split_docs = self.split_documents(docs, text_splitter)
-        self.vectorstore = self.create_vectorstore(split_docs)
-        self.retriever = self.create_retriever(self.vectorstore)
+        self.vectorstore = self.load_or_create_vectorstore()
+        return self.build_chain(self.create_prompt())
+
+    async def acreate_chain(self):
+        # 벡터스토어 생성(임베딩)과 프롬프트 다운로드(hub)를 동시에 실행합니다.
+        self.vectorstore, prompt = await asyncio.gather(
+            asyncio.to_thread(self.load_or_create_vectorstore),
+            asyncio.to_thread(self.create_prompt),
+        )
+        return self.build_chain(prompt)
+
+    def build_chain(self, prompt):
+        if self.rerank_model_path is not None:
+            self.retriever = self.create_rerank_retriever(self.vectorstore)
+        else:
+            self.retriever = self.create_retriever(self.vectorstore)
+        self.chain = self.create_answer_chain(prompt)
+        return self
+
+    def create_answer_chain(self, prompt=None):
+        """question/context 를 받아 답변을 생성하는 chain 을 만듭니다. (검색 제외)"""
+        prompt = prompt or self.create_prompt()
         model = self.create_model()
-        prompt = self.create_prompt()
-        self.chain = (
+        context = itemgetter("context")
+        if self.context_max_tokens is not None:
+            context = context | RunnableLambda(self.format_docs)
+        chain = (
             {
                 "question": itemgetter("question"),
-                "context": itemgetter("context"),
+                "context": context,
             }
             | prompt
             | model
             | StrOutputParser()
         )
-        return self
+        if self.semantic_cache:
+            self.answer_cache = SemanticCache(
+                self.create_embedding(),
+                threshold=self.semantic_cache_threshold,
+                max_entries=self.semantic_cache_max_entries,
+            )
+            chain = self.answer_cache.wrap(chain)
+        return chain
+
+    def retrieve_batch(self, questions, max_workers=8):
+        """여러 질문의 검색 결과를 한 번에 구합니다."""
+        if (
+            isinstance(self.vectorstore, FAISS)
+            and self.search_type == "similarity"
+            and self.rerank_model_path is None
+        ):
+            # 질문을 동시에 임베딩한 뒤 FAISS 행렬 검색 1회로 처리합니다.
+            return batch_similarity_search(
+                self.vectorstore, questions, k=self.k, max_workers=max_workers
+            )
+        return self.retriever.batch(
+            list(questions), config={"max_concurrency": max_workers}
+        )
+
+    def answer_questions(self, questions, chat_history=None, max_workers=8):
+        """질문 목록에 대한 답변을 입력 순서대로 반환합니다. (야간 배치 작업용)
+
+        각 결과는 question, answer, context, error, retrieval_seconds,
+        generation_seconds 를 포함합니다. retrieval_seconds 는 일괄 검색 시간을
+        질문 수로 나눈 값입니다.
+        """
+        start = time.perf_counter()
+        contexts = self.retrieve_batch(questions, max_workers=max_workers)
+        retrieval_seconds = (time.perf_counter() - start) / max(len(questions), 1)
+        results = answer_batch(
+            self.chain,
+            questions,
+            contexts,
+            self.format_docs,
+            chat_history=chat_history,
+            max_workers=max_workers,
+        )
+        for result in results:
+            result["retrieval_seconds"] = retrieval_seconds
+        return results
+
+    async def aretrieve(self, question):
+        """질문 임베딩과 벡터 검색을 이벤트 루프를 막지 않고 실행합니다."""
+        return await self.retriever.ainvoke(question)
+
+    async def ainvoke(self, question, chat_history=None):
+        context = await self.aretrieve(question)
+        return await self.chain.ainvoke(
+            {
+                "question": question,
+                "context": context,
+                "chat_history": chat_history or [],
+            }
+        )
+
+    async def astream(self, question, chat_history=None):
+        context = await self.aretrieve(question)
+        async for chunk in self.chain.astream(
+            {
+                "question": question,
+                "context": context,
+                "chat_history": chat_history or [],
+            }
+        ):
+            yield chunk
+
+    async def abatch(self, questions, chat_history=None, max_concurrency=8):
+        """여러 질문을 최대 max_concurrency 개씩 동시에 처리하고, 입력 순서대로 답변을 반환합니다."""
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def answer(question):
+            async with semaphore:
+                return await self.ainvoke(question, chat_history)
+
+        return await asyncio.gather(*(answer(question) for question in questions))
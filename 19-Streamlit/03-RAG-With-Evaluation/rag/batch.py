@@ -0,0 +1,116 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+
+def batch_similarity_search(
+    vectorstore, questions: List[str], k: int = 4, max_workers: int = 8
+) -> List[List[Document]]:
+    """질문들을 스레드 풀에서 동시에 임베딩하고, FAISS 인덱스를 행렬 검색 1회로 조회합니다."""
+    if not isinstance(vectorstore, FAISS):
+        raise ValueError(
+            f"일괄 검색은 FAISS 벡터스토어만 지원합니다: {type(vectorstore).__name__}"
+        )
+    if not questions:
+        return []
+    # 질문은 문서와 다른 방식으로 임베딩하는 모델이 있으므로 embed_query 를 사용하고,
+    # 같은 질문은 한 번만 임베딩합니다.
+    unique = list(dict.fromkeys(questions))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        embedded = dict(
+            zip(
+                unique, executor.map(vectorstore.embedding_function.embed_query, unique)
+            )
+        )
+    vectors = np.asarray(
+        [embedded[question] for question in questions], dtype=np.float32
+    )
+    if getattr(vectorstore, "_normalize_L2", False):
+        import faiss
+
+        faiss.normalize_L2(vectors)
+    _, indices = vectorstore.index.search(vectors, k)
+    results = []
+    for row in indices:
+        docs = []
+        for i in row:
+            # 검색 결과가 k 개보다 적으면 -1 이 채워집니다.
+            if i == -1:
+                continue
+            doc_id = vectorstore.index_to_docstore_id[int(i)]
+            doc = vectorstore.docstore.search(doc_id)
+            docs.append(
+                Document(
+                    id=doc_id, page_content=doc.page_content, metadata=doc.metadata
+                )
+            )
+        results.append(docs)
+    return results
+
+
+def _context_key(docs: List[Document]) -> tuple:
+    return tuple(doc.id or doc.page_content for doc in docs)
+
+
+def answer_batch(
+    chain,
+    questions: List[str],
+    contexts: List[List[Document]],
+    format_docs,
+    chat_history: Optional[list] = None,
+    max_workers: int = 8,
+) -> List[Dict[str, Any]]:
+    """같은 context 를 공유하는 질문끼리 묶어 context 는 한 번만 만들고,
+    LLM 호출은 max_workers 개의 스레드로 동시에 실행합니다.
+
+    결과는 입력 순서대로 반환하며, 실패한 항목은 error 에 예외를 담습니다.
+    """
+    # context 가 같은 질문은 포맷된 context 문자열을 공유합니다.
+    formatted = {}
+    for docs in contexts:
+        key = _context_key(docs)
+        if key not in formatted:
+            formatted[key] = format_docs(docs)
+
+    # 같은 context 에 대한 같은 질문은 LLM 을 한 번만 호출합니다.
+    tasks = {}
+    for question, docs in zip(questions, contexts):
+        tasks.setdefault((question, _context_key(docs)), None)
+
+    def run(task):
+        question, key = task
+        start = time.perf_counter()
+        try:
+            answer = chain.invoke(
+                {
+                    "question": question,
+                    "context": formatted[key],
+                    "chat_history": chat_history or [],
+                }
+            )
+            error = None
+        except Exception as e:
+            answer, error = None, e
+        return answer, error, time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for task, result in zip(tasks, executor.map(run, list(tasks))):
+            tasks[task] = result
+
+    results = []
+    for question, docs in zip(questions, contexts):
+        answer, error, seconds = tasks[(question, _context_key(docs))]
+        results.append(
+            {
+                "question": question,
+                "answer": answer,
+                "context": docs,
+                "error": error,
+                "generation_seconds": seconds,
+            }
+        )
+    return results
@@ -0,0 +1,323 @@
+import argparse
+import json
+import os
+import resource
+import tempfile
+import threading
+import time
+from typing import Callable, List, Optional
+
+import numpy as np
+
+
+def _timeit(fn: Callable, repeats: int) -> float:
+    """fn 을 repeats 번 실행한 평균 시간(ms)을 반환합니다."""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def bench_mmr(
+    fetch_ks: List[int] = (50, 200, 1000),
+    k: int = 10,
+    dim: int = 1536,
+    repeats: int = 10,
+    seed: int = 0,
+) -> List[dict]:
+    """NumPy MMR 과 LangChain 기본 MMR 의 지연시간을 fetch_k 별로 비교합니다."""
+    from langchain_community.vectorstores.utils import maximal_marginal_relevance
+
+    from rag.mmr import mmr_select
+
+    rng = np.random.default_rng(seed)
+    results = []
+    for fetch_k in fetch_ks:
+        candidates = rng.normal(size=(fetch_k, dim)).astype(np.float32)
+        query = rng.normal(size=dim).astype(np.float32)
+        baseline = _timeit(
+            lambda: maximal_marginal_relevance(query, candidates, k=k), repeats
+        )
+        vectorized = _timeit(lambda: mmr_select(query, candidates, k=k), repeats)
+        results.append(
+            {
+                "fetch_k": fetch_k,
+                "k": k,
+                "langchain_ms": baseline,
+                "numpy_ms": vectorized,
+                "speedup": baseline / vectorized,
+                "same_selection": maximal_marginal_relevance(query, candidates, k=k)
+                == mmr_select(query, candidates, k=k),
+            }
+        )
+    return results
+
+
+def _synthetic_pages(num_pages: int, seed: int = 0) -> List[str]:
+    # 문단/줄바꿈/공백이 섞인 PDF 페이지 형태의 텍스트를 생성합니다.
+    rng = np.random.default_rng(seed)
+    words = [
+        "인공지능",
+        "모델",
+        "데이터",
+        "정책",
+        "투자",
+        "AI",
+        "2023년",
+        "발표",
+        "기업",
+    ]
+    pages = []
+    for _ in range(num_pages):
+        lines = []
+        for _ in range(rng.integers(30, 60)):
+            lines.append(" ".join(rng.choice(words, size=rng.integers(3, 15))))
+            if rng.random() < 0.15:
+                lines.append("")
+        pages.append("\n".join(lines) + "\n")
+    return pages
+
+
+def bench_splitter(
+    num_pages: List[int] = (100, 1000),
+    chunk_size: int = 300,
+    chunk_overlap: int = 50,
+    repeats: int = 3,
+) -> List[dict]:
+    """FastRecursiveCharacterTextSplitter 와 LangChain 기본 splitter 를 비교합니다."""
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    from rag.splitter import FastRecursiveCharacterTextSplitter
+
+    baseline_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap
+    )
+    fast_splitter = FastRecursiveCharacterTextSplitter(
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap
+    )
+    results = []
+    for n in num_pages:
+        pages = _synthetic_pages(n)
+        baseline = _timeit(
+            lambda: [baseline_splitter.split_text(page) for page in pages], repeats
+        )
+        fast = _timeit(
+            lambda: [fast_splitter.split_text(page) for page in pages], repeats
+        )
+        results.append(
+            {
+                "pages": n,
+                "chars": sum(len(page) for page in pages),
+                "langchain_ms": baseline,
+                "fast_ms": fast,
+                "speedup": baseline / fast,
+                "identical": [baseline_splitter.split_text(p) for p in pages]
+                == [fast_splitter.split_text(p) for p in pages],
+            }
+        )
+    return results
+
+
+# 저장소에 포함된 한국어 샘플 텍스트 (synthetic PDF 본문으로 사용)
+SAMPLE_TEXT = os.path.join(
+    os.path.dirname(__file__),
+    "..",
+    "..",
+    "..",
+    "07-TextSplitter/data/appendix-keywords.txt",
+)
+
+
+def make_sample_pdf(path: str, num_pages: int, lines_per_page: int = 45) -> str:
+    """샘플 텍스트(없으면 synthetic 텍스트)로 num_pages 페이지 PDF 를 생성합니다."""
+    import pymupdf
+
+    if os.path.exists(SAMPLE_TEXT):
+        with open(SAMPLE_TEXT, encoding="utf-8") as f:
+            lines = [line.strip() for line in f if line.strip()]
+    else:
+        lines = _synthetic_pages(1)[0].splitlines()
+    # 긴 줄은 페이지 폭에 맞게 자릅니다.
+    lines = [line[i : i + 45] for line in lines for i in range(0, len(line), 45)]
+    pdf = pymupdf.open()
+    for page_number in range(num_pages):
+        page = pdf.new_page()
+        for i in range(lines_per_page):
+            line = lines[(page_number * lines_per_page + i) % len(lines)]
+            page.insert_text((50, 60 + i * 16), line, fontname="korea", fontsize=10)
+    pdf.save(path)
+    pdf.close()
+    return path
+
+
+def _process_peak_rss_mb() -> float:
+    # 프로세스 시작 이후의 최대 RSS 입니다. (Linux 의 ru_maxrss 는 KB 단위)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _current_rss_mb() -> Optional[float]:
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    try:
+        # psutil 이 없으면 Linux 의 /proc 에서 읽습니다. (두 번째 값이 RSS 페이지 수)
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except OSError:
+        return None
+    return pages * resource.getpagesize() / (1024 * 1024)
+
+
+class _RSSSampler:
+    """with 블록 동안 RSS 를 주기적으로 읽어, 시작 시점 대비 최대 증가량(MB)을 구합니다.
+
+    ru_maxrss 는 프로세스 전체의 누적 최대값이라 앞 단계의 최대값이 뒤 단계에도
+    그대로 남습니다. 샘플링 간격보다 짧게 생겼다 사라지는 메모리는 놓칠 수 있습니다.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.peak_delta_mb = None
+        self._stop = threading.Event()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self._peak = max(self._peak, _current_rss_mb())
+
+    def __enter__(self):
+        self._start = _current_rss_mb()
+        if self._start is not None:
+            self._peak = self._start
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._start is not None:
+            self._stop.set()
+            self._thread.join()
+            self._peak = max(self._peak, _current_rss_mb())
+            self.peak_delta_mb = self._peak - self._start
+
+
+def _stage(results: dict, name: str, fn: Callable, count_key: str, count_fn):
+    start = time.perf_counter()
+    with _RSSSampler() as rss:
+        value = fn()
+    seconds = time.perf_counter() - start
+    count = count_fn(value)
+    results[name] = {
+        "seconds": seconds,
+        "peak_rss_delta_mb": rss.peak_delta_mb,
+        "process_peak_rss_mb": _process_peak_rss_mb(),
+        count_key: count,
+        f"{count_key}_per_second": count / seconds if seconds else None,
+    }
+    return value
+
+
+def bench_ingest(
+    source_uris: Optional[List[str]] = None,
+    num_pages: List[int] = (20, 100),
+    embedding_size: int = 1536,
+    **chain_options,
+) -> List[dict]:
+    """PDFRetrievalChain 의 load / split / embed / index 단계별 시간, 메모리, 처리량을 측정합니다.
+
+    peak_rss_delta_mb 는 단계가 실행되는 동안 늘어난 RSS 의 최대값이고,
+    process_peak_rss_mb 는 그 시점까지 프로세스 전체의 최대 RSS 입니다.
+
+    source_uris 를 주면 해당 PDF 들을, 아니면 num_pages 별 synthetic PDF 를 사용합니다.
+    임베딩은 API 호출 없이 stub(DeterministicFakeEmbedding) 으로 계산합니다.
+    chain_options 는 PDFRetrievalChain 에 그대로 전달됩니다. (예: split_by, pdf_backend)
+    """
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+
+    from rag import ann
+    from rag.pdf import PDFRetrievalChain
+
+    # 라이브러리 import 시간이 단계별 측정에 섞이지 않도록 미리 불러옵니다.
+    import faiss  # noqa: F401
+    import pdfplumber  # noqa: F401
+
+    embedding = DeterministicFakeEmbedding(size=embedding_size)
+    index_type = chain_options.pop("index_type", "flat")
+    workloads = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if source_uris:
+            workloads.append(list(source_uris))
+        else:
+            for n in num_pages:
+                path = os.path.join(tmp_dir, f"sample-{n}.pdf")
+                workloads.append([make_sample_pdf(path, n)])
+
+        results = []
+        for uris in workloads:
+            chain = PDFRetrievalChain(uris, embeddings=embedding, **chain_options)
+            result = {"source_uris": [os.path.basename(uri) for uri in uris]}
+            start = time.perf_counter()
+            docs = _stage(
+                result, "load", lambda: chain.load_documents(uris), "pages", len
+            )
+            chunks = _stage(
+                result,
+                "split",
+                lambda: chain.split_documents(docs, chain.create_text_splitter()),
+                "chunks",
+                len,
+            )
+            texts = [chunk.page_content for chunk in chunks]
+            vectors = _stage(
+                result,
+                "embed",
+                lambda: embedding.embed_documents(texts),
+                "chunks",
+                len,
+            )
+            _stage(
+                result,
+                "index",
+                lambda: ann.from_embeddings(
+                    texts,
+                    vectors,
+                    embedding,
+                    metadatas=[chunk.metadata for chunk in chunks],
+                    index_type=index_type,
+                ),
+                "vectors",
+                lambda vectorstore: vectorstore.index.ntotal,
+            )
+            total = time.perf_counter() - start
+            result["total"] = {
+                "seconds": total,
+                "process_peak_rss_mb": _process_peak_rss_mb(),
+                "pages_per_second": len(docs) / total,
+                "chunks_per_second": len(chunks) / total,
+            }
+            results.append(result)
+    return results
+
+
+BENCHMARKS = {"mmr": bench_mmr, "splitter": bench_splitter, "ingest": bench_ingest}
+
+
+if __name__ == "__main__":
+    # 예시: python -m rag.benchmark mmr
+    parser = argparse.ArgumentParser(description="RAG 구성요소 벤치마크")
+    # 예시: python -m rag.benchmark ingest --options '{"num_pages": [500], "split_by": "token"}'
+    parser.add_argument("name", choices=sorted(BENCHMARKS))
+    parser.add_argument(
+        "--options", type=json.loads, default={}, help="벤치마크 함수 인자 (JSON)"
+    )
+    parser.add_argument("--output", default=None, help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+    report = json.dumps(
+        BENCHMARKS[args.name](**args.options), indent=2, ensure_ascii=False
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+    print(report)
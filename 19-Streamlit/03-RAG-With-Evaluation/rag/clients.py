@@ -0,0 +1,15 @@
+from functools import lru_cache
+
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+
+
+@lru_cache(maxsize=None)
+def get_chat_model(model: str = "gpt-4o-mini", temperature: float = 0):
+    """같은 설정의 ChatOpenAI 클라이언트(HTTP 연결 풀 포함)를 프로세스 안에서 공유합니다."""
+    return ChatOpenAI(model=model, temperature=temperature)
+
+
+@lru_cache(maxsize=None)
+def get_embeddings(model: str = "text-embedding-3-small"):
+    """같은 모델의 OpenAIEmbeddings 클라이언트를 프로세스 안에서 공유합니다."""
+    return OpenAIEmbeddings(model=model)
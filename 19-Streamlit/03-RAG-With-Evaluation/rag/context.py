@@ -0,0 +1,114 @@
+from typing import Callable, List, Optional
+
+from langchain_core.documents import Document
+
+from rag.tokens import count_tokens
+
+
+def _page_key(doc: Document):
+    return (doc.metadata.get("source"), doc.metadata.get("page"))
+
+
+def _overlap(left: str, right: str, min_overlap: int) -> int:
+    """left 의 끝부분과 right 의 앞부분이 겹치는 길이를 반환합니다."""
+    for size in range(min(len(left), len(right)), min_overlap - 1, -1):
+        if left.endswith(right[:size]):
+            return size
+    return 0
+
+
+def _rank(docs: List[Document]) -> List[Document]:
+    # 재정렬 점수(relevance_score)가 있으면 점수 순, 없으면 검색 순서를 사용합니다.
+    if docs and all("relevance_score" in doc.metadata for doc in docs):
+        return sorted(docs, key=lambda doc: -doc.metadata["relevance_score"])
+    return list(docs)
+
+
+def _merge_page(texts: List[str], min_overlap: int) -> List[str]:
+    """같은 페이지의 chunk 중 포함되거나 겹치는(chunk_overlap) chunk 를 하나로 합칩니다."""
+    pieces = []
+    for text in texts:
+        if not any(text in piece for piece in pieces):
+            pieces = [piece for piece in pieces if piece not in text] + [text]
+    merged = True
+    while merged:
+        merged = False
+        for i, left in enumerate(pieces):
+            for j, right in enumerate(pieces):
+                if i == j:
+                    continue
+                size = _overlap(left, right, min_overlap)
+                if size:
+                    pieces[i] = left + right[size:]
+                    del pieces[j]
+                    merged = True
+                    break
+            if merged:
+                break
+    return pieces
+
+
+def _merge_page_offsets(docs: List[Document]) -> List[str]:
+    """start_index/end_index 가 있는 chunk 는 문자열 비교 없이 offset 으로 합칩니다."""
+    pieces = []
+    for doc in sorted(docs, key=lambda doc: doc.metadata["start_index"]):
+        start, end = doc.metadata["start_index"], doc.metadata["end_index"]
+        if pieces and start <= pieces[-1][1]:
+            last_start, last_end, text = pieces[-1]
+            if end > last_end:
+                text += doc.page_content[last_end - start :]
+            pieces[-1] = (last_start, max(end, last_end), text)
+        else:
+            pieces.append((start, end, doc.page_content))
+    return [text for _, _, text in pieces]
+
+
+def pack_documents(
+    docs: List[Document],
+    max_tokens: Optional[int] = None,
+    token_counter: Callable[[str], int] = count_tokens,
+    min_overlap: int = 10,
+) -> List[Document]:
+    """검색된 chunk 를 토큰 예산 안에서 페이지 단위 Document 로 묶습니다.
+
+    - 중복/포함/겹치는 chunk 는 하나로 합칩니다.
+    - 점수(순위)가 높은 chunk 부터 max_tokens 까지 채웁니다. (최소 1개는 포함)
+    - 선택된 chunk 중 같은 페이지의 chunk 는 하나의 Document 로 합칩니다.
+    """
+    ranked = _rank(docs)
+    pages = {}
+    for doc in ranked:
+        pages.setdefault(_page_key(doc), []).append(doc)
+
+    # 페이지별로 겹치는 chunk 를 합치고, 합쳐진 조각의 순위는 가장 높은 chunk 를 따릅니다.
+    candidates = []
+    for key, page_docs in pages.items():
+        if all("end_index" in doc.metadata for doc in page_docs):
+            pieces = _merge_page_offsets(page_docs)
+        else:
+            pieces = _merge_page([d.page_content for d in page_docs], min_overlap)
+        for piece in pieces:
+            rank = min(
+                i
+                for i, doc in enumerate(ranked)
+                if _page_key(doc) == key and doc.page_content in piece
+            )
+            candidates.append((rank, key, piece))
+    candidates.sort(key=lambda candidate: candidate[0])
+
+    selected = {}
+    used_tokens = 0
+    for rank, key, piece in candidates:
+        if max_tokens is not None:
+            tokens = token_counter(piece)
+            if selected and used_tokens + tokens > max_tokens:
+                continue
+            used_tokens += tokens
+        selected.setdefault(key, (rank, []))[1].append(piece)
+
+    results = []
+    for key, (rank, pieces) in sorted(selected.items(), key=lambda item: item[1][0]):
+        results.append(
+            Document(page_content="\n".join(pieces), metadata=pages[key][0].metadata)
+        )
+    return results
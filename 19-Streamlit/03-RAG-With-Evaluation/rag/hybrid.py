@@ -0,0 +1,182 @@
+import math
+import re
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_community.vectorstores import FAISS
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from rag.compact import CompactVectorStore
+
+# dense 검색과 BM25 검색을 동시에 실행하기 위한 공용 스레드 풀
+_executor = ThreadPoolExecutor(max_workers=8)
+
+
+@lru_cache(maxsize=1)
+def _get_kiwi():
+    from kiwipiepy import Kiwi
+
+    return Kiwi()
+
+
+def kiwi_tokenize(text: str) -> List[str]:
+    """Kiwi 형태소 분석기로 명사/동사/외국어/숫자 형태소를 추출합니다."""
+    return [
+        token.form.lower()
+        for token in _get_kiwi().tokenize(text)
+        if token.tag[0] in ("N", "V") or token.tag in ("SL", "SN", "SH", "XR")
+    ]
+
+
+def simple_tokenize(text: str) -> List[str]:
+    """공백/문장부호 기준으로 단어를 나눕니다."""
+    return re.findall(r"\w+", text.lower())
+
+
+def default_tokenizer() -> Callable[[str], List[str]]:
+    # kiwipiepy 가 설치되어 있으면 한국어 형태소 분석기를 사용합니다.
+    try:
+        import kiwipiepy  # noqa: F401
+    except ImportError:
+        return simple_tokenize
+    return kiwi_tokenize
+
+
+class BM25Index:
+    """역색인(inverted index) 기반 BM25 검색기입니다."""
+
+    def __init__(
+        self,
+        texts: List[str],
+        tokenizer: Optional[Callable[[str], List[str]]] = None,
+        k1: float = 1.5,
+        b: float = 0.75,
+    ):
+        self.tokenizer = tokenizer or default_tokenizer()
+        self.k1 = k1
+        self.b = b
+        # term -> (문서 번호 배열, term frequency 배열)
+        postings: Dict[str, Tuple[List[int], List[int]]] = defaultdict(lambda: ([], []))
+        lengths = []
+        for i, text in enumerate(texts):
+            counts = Counter(self.tokenizer(text))
+            lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                postings[term][0].append(i)
+                postings[term][1].append(tf)
+        self.num_docs = len(texts)
+        self.doc_lengths = np.asarray(lengths, dtype=np.float32)
+        self.avg_length = float(self.doc_lengths.mean()) if lengths else 0.0
+        self.postings = {
+            term: (np.asarray(ids, dtype=np.int64), np.asarray(tfs, dtype=np.float32))
+            for term, (ids, tfs) in postings.items()
+        }
+
+    def idf(self, term: str) -> float:
+        df = len(self.postings[term][0])
+        return math.log(1 + (self.num_docs - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """(문서 번호, 점수) 목록을 점수가 높은 순서로 반환합니다."""
+        scores = np.zeros(self.num_docs, dtype=np.float32)
+        norm = self.k1 * (
+            1 - self.b + self.b * self.doc_lengths / (self.avg_length or 1)
+        )
+        for term in set(self.tokenizer(query)):
+            if term not in self.postings:
+                continue
+            ids, tfs = self.postings[term]
+            scores[ids] += self.idf(term) * tfs * (self.k1 + 1) / (tfs + norm[ids])
+        candidates = np.flatnonzero(scores)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(int(i), float(scores[i])) for i in candidates]
+
+
+def _doc_key(doc: Document) -> str:
+    if doc.id:
+        return doc.id
+    return "\0".join(
+        [
+            str(doc.metadata.get("source", "")),
+            str(doc.metadata.get("page", "")),
+            doc.page_content,
+        ]
+    )
+
+
+def reciprocal_rank_fusion(
+    rankings: List[List[Document]], weights: List[float], c: int = 60
+) -> List[Document]:
+    """여러 검색 결과를 RRF(Reciprocal Rank Fusion) 점수로 합칩니다."""
+    scores: Dict[str, float] = defaultdict(float)
+    docs: Dict[str, Document] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, doc in enumerate(ranking):
+            key = _doc_key(doc)
+            scores[key] += weight / (c + rank + 1)
+            docs.setdefault(key, doc)
+    return [docs[key] for key in sorted(scores, key=scores.get, reverse=True)]
+
+
+def stored_documents(vectorstore) -> List[Document]:
+    """FAISS/CompactVectorStore 에 저장된 모든 chunk 를 저장 순서대로 반환합니다."""
+    if isinstance(vectorstore, CompactVectorStore):
+        return vectorstore.get_documents()
+    if not isinstance(vectorstore, FAISS):
+        raise ValueError(
+            f"hybrid 검색을 지원하지 않는 벡터스토어입니다: {type(vectorstore).__name__}"
+        )
+    documents = []
+    for i in range(len(vectorstore.index_to_docstore_id)):
+        doc_id = vectorstore.index_to_docstore_id[i]
+        doc = vectorstore.docstore.search(doc_id)
+        documents.append(
+            Document(id=doc_id, page_content=doc.page_content, metadata=doc.metadata)
+        )
+    return documents
+
+
+class HybridRetriever(BaseRetriever):
+    """BM25 와 dense(FAISS/CompactVectorStore) 검색을 동시에 실행하고 RRF 로 결과를 합칩니다."""
+
+    vectorstore: Any
+    bm25: Any
+    documents: List[Document]
+    k: int = 4
+    fetch_k: int = 20
+    weights: List[float] = [0.5, 0.5]
+    rrf_c: int = 60
+
+    @classmethod
+    def from_vectorstore(
+        cls,
+        vectorstore,
+        tokenizer: Optional[Callable[[str], List[str]]] = None,
+        **kwargs,
+    ) -> "HybridRetriever":
+        """벡터스토어에 저장된 chunk 들로 BM25 역색인을 생성합니다."""
+        documents = stored_documents(vectorstore)
+        bm25 = BM25Index([doc.page_content for doc in documents], tokenizer=tokenizer)
+        return cls(vectorstore=vectorstore, bm25=bm25, documents=documents, **kwargs)
+
+    def _sparse_search(self, query: str) -> List[Document]:
+        return [self.documents[i] for i, _ in self.bm25.search(query, self.fetch_k)]
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        dense = _executor.submit(
+            self.vectorstore.similarity_search, query, k=self.fetch_k
+        )
+        sparse = _executor.submit(self._sparse_search, query)
+        fused = reciprocal_rank_fusion(
+            [dense.result(), sparse.result()], self.weights, c=self.rrf_c
+        )
+        return fused[: self.k]
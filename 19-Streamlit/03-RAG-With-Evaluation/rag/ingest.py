@@ -0,0 +1,128 @@
+import queue
+import threading
+from typing import Iterable, Iterator, List, Optional
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+# 각 단계의 종료를 알리는 표식
+_DONE = object()
+
+
+class _StageError:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def split_in_batches(
+    documents: Iterable[Document], text_splitter, batch_size: int
+) -> Iterator[List[Document]]:
+    """문서를 한 페이지씩 분할하여 batch_size 개의 chunk 묶음으로 내보냅니다."""
+    batch = []
+    for doc in documents:
+        batch.extend(text_splitter.split_documents([doc]))
+        while len(batch) >= batch_size:
+            yield batch[:batch_size]
+            batch = batch[batch_size:]
+    if batch:
+        yield batch
+
+
+def _put(out_queue: queue.Queue, item, stop: threading.Event) -> bool:
+    # 큐가 가득 차 있어도 stop 이 설정되면 기다리지 않고 False 를 반환합니다.
+    while not stop.is_set():
+        try:
+            out_queue.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _run_stage(target, out_queue: queue.Queue, stop: threading.Event):
+    def run():
+        items = target()
+        try:
+            for item in items:
+                if not _put(out_queue, item, stop):
+                    return
+        except BaseException as e:
+            _put(out_queue, _StageError(e), stop)
+        finally:
+            # 중단된 경우에도 generator 를 닫아 정리 코드(finally)가 실행되게 합니다.
+            items.close()
+            _put(out_queue, _DONE, stop)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def _drain(in_queue: queue.Queue, stop: threading.Event) -> Iterator:
+    while True:
+        try:
+            item = in_queue.get(timeout=0.1)
+        except queue.Empty:
+            if stop.is_set():
+                return
+            continue
+        if item is _DONE:
+            return
+        if isinstance(item, _StageError):
+            raise item.error
+        yield item
+
+
+def stream_ingest(
+    documents: Iterable[Document],
+    text_splitter,
+    embedding,
+    batch_size: int = 64,
+    queue_size: int = 4,
+    vectorstore: Optional[FAISS] = None,
+) -> FAISS:
+    """load → split → embed → index 단계를 크기가 제한된 큐로 연결하여 색인합니다.
+
+    로드/분할과 임베딩은 각각 별도 스레드에서 실행되므로, 네트워크를 기다리는
+    임베딩과 CPU 를 사용하는 파싱이 겹쳐서 진행됩니다. 각 큐는 최대 queue_size 개의
+    batch 만 보관하므로 메모리 사용량이 전체 문서 크기와 무관하게 유지됩니다.
+
+    색인할 chunk 가 하나도 없으면 ValueError 를 발생시킵니다.
+    """
+    split_queue = queue.Queue(maxsize=queue_size)
+    embed_queue = queue.Queue(maxsize=queue_size)
+    # 어느 단계에서든 오류가 나면 나머지 스레드를 멈추기 위한 신호
+    stop = threading.Event()
+
+    def split_stage():
+        yield from split_in_batches(documents, text_splitter, batch_size)
+
+    def embed_stage():
+        for batch in _drain(split_queue, stop):
+            texts = [doc.page_content for doc in batch]
+            yield batch, embedding.embed_documents(texts)
+
+    threads = [
+        _run_stage(split_stage, split_queue, stop),
+        _run_stage(embed_stage, embed_queue, stop),
+    ]
+    try:
+        for batch, vectors in _drain(embed_queue, stop):
+            text_embeddings = [
+                (doc.page_content, vector) for doc, vector in zip(batch, vectors)
+            ]
+            metadatas = [doc.metadata for doc in batch]
+            if vectorstore is None:
+                vectorstore = FAISS.from_embeddings(
+                    text_embeddings, embedding=embedding, metadatas=metadatas
+                )
+            else:
+                vectorstore.add_embeddings(text_embeddings, metadatas=metadatas)
+    finally:
+        # 색인 중 오류가 나도 큐에 넣으려고 기다리는 스레드가 남지 않게 합니다.
+        stop.set()
+        for thread in threads:
+            thread.join()
+    if vectorstore is None:
+        raise ValueError("색인할 텍스트가 없습니다.")
+    return vectorstore
@@ -0,0 +1,80 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterator, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+
+def _pdf_metadata(pdf) -> dict:
+    # PDFPlumberLoader 와 동일한 메타데이터 형식을 사용합니다.
+    return {
+        k: pdf.metadata[k] for k in pdf.metadata if type(pdf.metadata[k]) in [str, int]
+    }
+
+
+def count_pages(source_uri: str) -> int:
+    import pdfplumber
+
+    with pdfplumber.open(source_uri) as pdf:
+        return len(pdf.pages)
+
+
+def extract_pages(source_uri: str, start: int, end: int) -> List[Tuple[str, dict]]:
+    """PDF 의 [start, end) 페이지 텍스트를 추출합니다. (프로세스 풀에서 실행)"""
+    import pdfplumber
+
+    pages = []
+    with pdfplumber.open(source_uri) as pdf:
+        extra = _pdf_metadata(pdf)
+        for page in pdf.pages[start:end]:
+            metadata = {
+                "source": source_uri,
+                "file_path": source_uri,
+                "page": page.page_number - 1,
+                "total_pages": len(pdf.pages),
+                **extra,
+            }
+            pages.append((page.extract_text() + "\n", metadata))
+            # 페이지 캐시를 비워서 워커 메모리가 커지지 않도록 합니다.
+            page.close()
+    return pages
+
+
+def page_ranges(
+    source_uris: List[str], pages_per_task: int
+) -> List[Tuple[str, int, int]]:
+    """파일을 pages_per_task 페이지 단위의 작업으로 나눕니다."""
+    tasks = []
+    for source_uri in source_uris:
+        total_pages = count_pages(source_uri)
+        for start in range(0, total_pages, pages_per_task):
+            tasks.append((source_uri, start, min(start + pages_per_task, total_pages)))
+    return tasks
+
+
+def iter_pdf_documents(
+    source_uris: List[str],
+    max_workers: Optional[int] = None,
+    pages_per_task: int = 16,
+) -> Iterator[Document]:
+    """여러 PDF 를 프로세스 풀에서 병렬로 파싱하고, 원래 순서대로 Document 를 내보냅니다.
+
+    앞선 페이지들의 파싱이 끝나는 즉시 yield 하므로, 마지막 페이지를 기다리지 않고
+    분할/임베딩을 시작할 수 있습니다.
+    """
+    tasks = page_ranges(source_uris, pages_per_task)
+    if not tasks:
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(extract_pages, *task): i for i, task in enumerate(tasks)
+        }
+        finished = {}
+        next_index = 0
+        for future in as_completed(futures):
+            finished[futures[future]] = future.result()
+            # 순서가 맞는 작업부터 차례대로 내보냅니다.
+            while next_index in finished:
+                for page_content, metadata in finished.pop(next_index):
+                    yield Document(page_content=page_content, metadata=metadata)
+                next_index += 1
@@ -1,15 +1,64 @@
+from functools import partial
 from rag.base import RetrievalChain
+from rag.index_cache import FAISSIndexCache
+from rag.parallel import iter_pdf_documents
+from rag.jobs import IngestionJob
+from rag.pdf_cache import (
+    PDFExtractionCache,
+    PDFPageLoader,
+    count_pages,
+    extract_pages,
+    page_documents,
+    resolve_backend,
+)
+from rag.splitter import FastRecursiveCharacterTextSplitter, TokenSentenceTextSplitter
 from langchain_community.document_loaders import PDFPlumberLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from typing import List, Annotated
+from typing import Iterator, List, Annotated
+from langchain_core.documents import Document
 
 
 class PDFRetrievalChain(RetrievalChain):
-    def __init__(self, source_uri: Annotated[str, "Source URI"]):
+    def __init__(self, source_uri: Annotated[str, "Source URI"], **kwargs):
+        super().__init__(**kwargs)
         self.source_uri = source_uri
-        self.k = 6
+        self.k = kwargs.get("k", 6)
+        # 프로세스 풀을 사용한 병렬 PDF 파싱 설정
+        self.parallel_load = kwargs.get("parallel_load", False)
+        self.max_workers = kwargs.get("max_workers", None)
+        self.pages_per_task = kwargs.get("pages_per_task", 16)
+        # 페이지별 추출 결과 캐시 폴더와 추출 엔진 ("pdfplumber", "pymupdf", "auto")
+        self.extraction_cache_dir = kwargs.get("extraction_cache_dir", None)
+        self.pdf_backend = kwargs.get("pdf_backend", "pdfplumber")
+        # "character"(글자 수) 또는 "token"(토큰 수 + 문장 경계) 단위 분할
+        self.split_by = kwargs.get("split_by", "character")
+        self.chunk_tokens = kwargs.get("chunk_tokens", 256)
+        self.chunk_overlap_tokens = kwargs.get("chunk_overlap_tokens", 32)
+
+    def lazy_load_documents(self, source_uris: List[str]) -> Iterator[Document]:
+        """페이지 파싱이 끝나는 대로 Document 를 순서대로 내보냅니다."""
+        if self.extraction_cache_dir is not None:
+            # 이미 추출한 페이지는 캐시에서 읽고, 없는 페이지만 병렬로 추출합니다.
+            cache = PDFExtractionCache(
+                self.extraction_cache_dir,
+                max_workers=self.max_workers,
+                pages_per_task=self.pages_per_task,
+            )
+            for source_uri in source_uris:
+                yield from cache.lazy_load(source_uri, backend=self.pdf_backend)
+        elif self.parallel_load:
+            yield from iter_pdf_documents(
+                source_uris,
+                max_workers=self.max_workers,
+                pages_per_task=self.pages_per_task,
+            )
+        else:
+            for source_uri in source_uris:
+                yield from PDFPlumberLoader(source_uri).lazy_load()
 
     def load_documents(self, source_uris: List[str]):
+        if self.parallel_load or self.extraction_cache_dir is not None:
+            return list(self.lazy_load_documents(source_uris))
+
         docs = []
         for source_uri in source_uris:
             loader = PDFPlumberLoader(source_uri)
@@ -17,5 +66,72 @@ class PDFRetrievalChain(RetrievalChain):
 
         return docs
 
+    def count_pages(self, source_uri: str) -> int:
+        return count_pages(source_uri, resolve_backend(self.pdf_backend))
+
+    def load_pages(self, source_uri: str, pages: List[int]) -> List[Document]:
+        """지정한 페이지만 Document 로 불러옵니다. (extraction_cache_dir 가 있으면 캐시 사용)"""
+        if self.extraction_cache_dir is not None:
+            cache = PDFExtractionCache(
+                self.extraction_cache_dir,
+                max_workers=self.max_workers,
+                pages_per_task=self.pages_per_task,
+            )
+            return cache.load(source_uri, backend=self.pdf_backend, pages=pages)
+        info, texts = extract_pages(
+            source_uri, resolve_backend(self.pdf_backend), pages
+        )
+        return list(page_documents(source_uri, info, dict(zip(pages, texts))))
+
+    def create_ingestion_job(self, pages_per_batch: int = 8) -> IngestionJob:
+        """페이지 batch 단위로 색인하는 백그라운드 작업을 만듭니다.
+
+        IngestionJobs.submit 으로 실행하며, index_cache_dir 가 있으면 캐시된 인덱스를
+        바로 사용하고 색인이 끝난 인덱스를 캐시에 저장합니다.
+        """
+        if self.vector_storage != "float32" or self.index_type != "flat":
+            raise ValueError(
+                "페이지 단위 색인 작업은 float32 flat FAISS 인덱스만 지원합니다."
+            )
+        text_splitter = self.create_text_splitter()
+        embedding = self.create_embedding()
+        index_cache = self.create_index_cache()
+        key = FAISSIndexCache.make_key(self.source_uri, text_splitter, embedding)
+        vectorstore = None
+        on_complete = None
+        if index_cache is not None:
+            vectorstore = index_cache.load(key, embedding)
+            on_complete = partial(index_cache.save, key)
+        load_pages = self.load_pages
+        on_finish = None
+        if self.extraction_cache_dir is not None:
+            # 작업 하나가 같은 캐시를 사용하고, 추출 결과는 작업이 끝날 때 저장합니다.
+            load_pages = PDFPageLoader(
+                PDFExtractionCache(
+                    self.extraction_cache_dir,
+                    max_workers=self.max_workers,
+                    pages_per_task=self.pages_per_task,
+                ),
+                backend=self.pdf_backend,
+            )
+            on_finish = load_pages.flush
+        return IngestionJob(
+            key,
+            self.source_uri,
+            load_pages,
+            self.count_pages,
+            text_splitter,
+            embedding,
+            pages_per_batch=pages_per_batch,
+            on_complete=on_complete,
+            vectorstore=vectorstore,
+            on_finish=on_finish,
+        )
+
     def create_text_splitter(self):
-        return RecursiveCharacterTextSplitter(chunk_size=300, chunk_overlap=50)
+        if self.split_by == "token":
+            return TokenSentenceTextSplitter(
+                chunk_size=self.chunk_tokens, chunk_overlap=self.chunk_overlap_tokens
+            )
+        # RecursiveCharacterTextSplitter 와 같은 결과를 offset 기반으로 빠르게 만듭니다.
+        return FastRecursiveCharacterTextSplitter(chunk_size=300, chunk_overlap=50)
@@ -0,0 +1,97 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Optional
+
+from langchain_core.load import dumpd, load
+
+# 캐시 파일 형식이 바뀌면 값을 올려 이전 캐시를 무시합니다.
+CACHE_VERSION = 1
+
+# handle -> (prompt, fetched_at)
+_memory = {}
+_lock = threading.Lock()
+
+
+def _cache_path(cache_dir: str, handle: str) -> str:
+    name = handle.replace("/", "__").replace(":", "@")
+    return os.path.join(cache_dir, f"{name}.json")
+
+
+def _read(path: str) -> Optional[dict]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if entry.get("version") != CACHE_VERSION:
+        return None
+    return entry
+
+
+def _write(path: str, entry: dict):
+    # 임시 파일에 쓴 뒤 교체하여, 동시에 읽는 프로세스가 깨진 파일을 보지 않게 합니다.
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(entry, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def pull_prompt(
+    handle: str,
+    cache_dir: str = ".cache/prompts",
+    max_age: Optional[float] = 86400,
+    fallback_path: Optional[str] = None,
+):
+    """hub 프롬프트를 메모리 → 파일 캐시 → hub 순서로 가져옵니다.
+
+    - "owner/repo:commit" 처럼 commit 을 고정한 프롬프트는 한 번 받으면 다시 받지 않습니다.
+    - commit 을 고정하지 않은 프롬프트는 max_age 초가 지나면 hub 에서 새로 받습니다.
+    - hub 에 접속할 수 없으면 오래된 캐시, 그 다음 fallback_path(yaml) 를 사용합니다.
+      이 경우 다음 호출에서 다시 hub 에서 받아 봅니다.
+    """
+    pinned = ":" in handle
+
+    def is_fresh(fetched_at: float) -> bool:
+        return pinned or max_age is None or time.time() - fetched_at < max_age
+
+    with _lock:
+        cached = _memory.get(handle)
+    # 메모리에 있는 프롬프트도 파일 캐시와 같은 max_age 기준으로 새로 받습니다.
+    if cached is not None and is_fresh(cached[1]):
+        return cached[0]
+
+    path = _cache_path(cache_dir, handle)
+    entry = _read(path)
+    fresh = entry is not None and is_fresh(entry["fetched_at"])
+
+    if not fresh:
+        try:
+            from langchain import hub
+
+            prompt = hub.pull(handle)
+            entry = {
+                "version": CACHE_VERSION,
+                "handle": handle,
+                "commit": (prompt.metadata or {}).get("lc_hub_commit_hash"),
+                "fetched_at": time.time(),
+                "prompt": dumpd(prompt),
+            }
+            _write(path, entry)
+        except Exception:
+            # 오프라인 등으로 실패하면 캐시나 로컬 파일로 대체합니다.
+            if entry is None and fallback_path is None:
+                raise
+    if entry is None:
+        # fallback 프롬프트는 메모리에 두지 않아, 다음 호출에서 hub 를 다시 시도합니다.
+        from langchain_core.prompts import load_prompt
+
+        return load_prompt(fallback_path, encoding="utf-8")
+
+    prompt = load(entry["prompt"])
+    with _lock:
+        _memory[handle] = (prompt, entry["fetched_at"])
+    return prompt
@@ -1,7 +1,20 @@
-def format_docs(docs):
+from rag.context import pack_documents
+
+
+def format_docs(docs, max_tokens=None):
+    # max_tokens 를 지정하면 겹치는 chunk 를 합치고, 점수가 높은 순서로
+    # max_tokens 까지만 포함합니다. (None 이면 모든 문서를 그대로 이어 붙입니다.)
+    if max_tokens is not None:
+        docs = pack_documents(docs, max_tokens=max_tokens)
     return "\n".join(
         [
-            f"<document><content>{doc.page_content}</content><source>{doc.metadata['source']}</source><page>{int(doc.metadata['page'])+1}</page></document>"
+            f"<document><content>{doc.page_content}</content><source>{doc.metadata.get('source', '')}</source><page>{_page_number(doc)}</page></document>"
             for doc in docs
         ]
     )
+
+
+def _page_number(doc):
+    # page 메타데이터가 없는 문서(웹 문서 등)는 빈 값으로 표시합니다.
+    page = doc.metadata.get("page")
+    return "" if page is None else int(page) + 1